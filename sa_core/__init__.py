@@ -5,10 +5,11 @@ import sa_core.sa_lib as lib
 import sa_core.sa_math as math
 
 from .analyzer_core import SaMethodsHandler, AnalyzerParams, \
-    ChiSquareMethod, RegularSingularMethod, KochZhaoAnalysisMethod
+    ChiSquareMethod, RegularSingularMethod, KochZhaoAnalysisMethod, SamplePairsMethod
 from .image_handler import ImageHandler, ImgChannel
 from .stego_module import LsbHider, LsbExtractor, KochZhaoHider, KochZhaoExtractor
 
 __all__ = ['lib', 'math', 'ImageHandler', 'ImgChannel', 'SaMethodsHandler', 'AnalyzerParams',
            'LsbHider', 'LsbExtractor', 'KochZhaoHider', 'KochZhaoExtractor',
-           'ChiSquareMethod', 'RegularSingularMethod', 'KochZhaoAnalysisMethod']
+           'ChiSquareMethod', 'RegularSingularMethod', 'KochZhaoAnalysisMethod',
+           'SamplePairsMethod']
@@ -4,9 +4,11 @@ from dataclasses import dataclass
 # Struct for storage parameters for SaMethodsHandler
 @dataclass
 class AnalyzerParams:
-    img: str
+    img: object  # Image path, image bytes, file-like object, pixels array or ImageHandler instance
     do_chisqr: bool
     do_rs: bool
     do_kza: bool
     chisqr_visualize: bool
     kza_extract: bool
+    chisqr_lazy_visualize: bool = False  # Chi Square visualized image is rendered on first access to it
+    do_spa: bool = False  # Sample Pairs Analysis method (fast estimation of LSB hidden message volume)
@@ -1,10 +1,12 @@
 # All steganalysis methods and they structures of results
 
-from .chi_square_method import ChiSquareMethod
-from .regular_singular import RegularSingularMethod
+from .chi_square_method import ChiSquareMethod, visualize_chisqr_result
+from .regular_singular import RegularSingularMethod, RsExecutor
 from .koch_zhao_analysis import KochZhaoAnalysisMethod
+from .sample_pairs import SamplePairsMethod
 
-from ._result_structs import ChiSqrRes, RsRes, KzaRes
+from ._result_structs import ChiSqrRes, ChiSqrMapRes, RsRes, SpaRes, KzaRes, KzaCandidate
 
-__all__ = ['ChiSquareMethod', 'RegularSingularMethod', 'KochZhaoAnalysisMethod',
-           'ChiSqrRes', 'RsRes', 'KzaRes']
+__all__ = ['ChiSquareMethod', 'RegularSingularMethod', 'KochZhaoAnalysisMethod', 'SamplePairsMethod',
+           'RsExecutor', 'visualize_chisqr_result', 'ChiSqrRes', 'ChiSqrMapRes', 'RsRes', 'SpaRes', 'KzaRes',
+           'KzaCandidate']
@@ -1,19 +1,86 @@
-# Results of Chi-Square method struct
+# Results of Chi-Square method struct.
+# Compact results are p-values and hidden data flags of all blocks (in raster order) and blocks size:
+# visualized image array can be rendered by them lazily (on first access) if renderer is set.
+# Scanned is part of image blocks that were analyzed (less than 1 for early stopped scans) with confidence of decision
 class ChiSqrRes:
     fullness = None
-    visualized = None
+    p_values = None
+    hidden_flags = None
+    block_size = None
+    scanned = None
+    confidence = None
 
-    def __init__(self, fullness, visualized):
+    def __init__(self, fullness, visualized, p_values=None, hidden_flags=None, block_size=None,
+                 scanned=1.0, confidence=None):
         self.fullness = fullness
-        self.visualized = visualized
+        self.p_values = p_values
+        self.hidden_flags = hidden_flags
+        self.block_size = block_size
+        self.scanned = scanned
+        self.confidence = confidence
 
+        self.__visualized = visualized
+        self.__renderer = None  # Function that returns visualized image array for this result
 
-# Results of Regular-Singular method struct
+    @property
+    def visualized(self):
+        if self.__visualized is None and self.__renderer is not None:
+            self.__visualized = self.__renderer(self)
+        return self.__visualized
+
+    @visualized.setter
+    def visualized(self, visualized):
+        self.__visualized = visualized
+
+    # Sets function for lazy rendering of visualized image array (it is called with this result)
+    def set_renderer(self, renderer):
+        self.__renderer = renderer
+
+    # Renderer is not pickled: it can refer to image that must not be transferred with compact results
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_ChiSqrRes__renderer"] = None
+        return state
+
+
+# Results of Chi-Square method for independent tiles of image (heatmap) struct.
+# P-values and hidden data flags are 2-D arrays: one value for each tile of tiles grid
+class ChiSqrMapRes:
+    tile_size = None
+    p_values = None
+    hidden_flags = None
+    fullness = None
+
+    def __init__(self, tile_size, p_values, hidden_flags, fullness):
+        self.tile_size = tile_size
+        self.p_values = p_values
+        self.hidden_flags = hidden_flags
+        self.fullness = fullness
+
+
+# Results of Regular-Singular method struct (volume is combined by all masks, masks volumes are in masks order).
+# Sampled estimation has confidence interval of volume and sampled part of image
 class RsRes:
     volume = None
+    masks_volumes = None
+    interval = None
+    sampled = None
+
+    def __init__(self, volume, masks_volumes=None, interval=None, sampled=1.0):
+        self.volume = volume
+        self.masks_volumes = masks_volumes
+        self.interval = interval
+        self.sampled = sampled
+
+
+# Results of Sample Pairs method struct (volume is averaged by channels, channels volumes are in channels order)
+class SpaRes:
+    volume = None
+    channels_volumes = None
 
-    def __init__(self, volume):
+    def __init__(self, volume, channels_volumes=None):
         self.volume = volume
+        self.channels_volumes = channels_volumes
 
 
 # Results of Koch-Zhao Analysis method struct
@@ -28,3 +95,20 @@ class KzaRes:
         self.indexes = indexes
         self.volume = volume
         self.data = data
+
+
+# Candidate of Koch-Zhao Analysis sweep struct: channel name, pair of coefficients, threshold, interval indexes
+# and volume (it is 0 if threshold is not large enough to decode data)
+class KzaCandidate:
+    channel = None
+    coeffs = None
+    threshold = None
+    indexes = None
+    volume = None
+
+    def __init__(self, channel, coeffs, threshold, indexes, volume):
+        self.channel = channel
+        self.coeffs = coeffs
+        self.threshold = threshold
+        self.indexes = indexes
+        self.volume = volume
@@ -1,18 +1,19 @@
+import math
+
 import numpy as np
 
 from sa_core.image_handler import *
-from sa_core.sa_math import chi_sqr
+from sa_core.sa_math import chi_sqr_batch, unify_categories
 
 from .configs.chi_square_config import *
-from ._result_structs import ChiSqrRes
+from ._result_structs import ChiSqrRes, ChiSqrMapRes
 
 
 # Realize Chi-Square steganalysis method
 class ChiSquareMethod:
     def __init__(self, img_path):
-        self.__img = ImageHandler()
-        self.__img.load(img_path)
-        self.__imar = self.__img.get_array()
+        # Image can be passed as path, image bytes, file-like object, pixels array or ImageHandler instance
+        self.__img = to_image_handler(img_path)
 
         self.__log = ""
         self.__results = None
@@ -21,7 +22,8 @@ class ChiSquareMethod:
     def get_log(self):
         return self.__log
 
-    def execute(self, visualize=False):
+    # If 'lazy_visualize' is True visualized image array is rendered only on first access to it in results
+    def execute(self, visualize=False, lazy_visualize=False):
         # Clear last analysis data
         self.__log = ""
         self.__results = None
@@ -32,7 +34,7 @@ class ChiSquareMethod:
 
         # Analysis operation
         try:
-            r = self.__analyze(visualize)
+            r = self.__analyze(visualize, lazy_visualize)
             self.__results = r
         except Exception as ex:
             self.__log += "X\tCritical error: {0}\n".format(repr(ex))
@@ -42,6 +44,71 @@ class ChiSquareMethod:
         self.__write_results()
         return self.__results
 
+    # Fast triage: blocks are scanned until cumulative p-value stays above (or below) threshold for 'stop_blocks'
+    # consecutive blocks or for 'stop_fraction' of all image blocks (0 disables the condition).
+    # Results contain only scanned blocks, scanned part of image and confidence of decision
+    def execute_early_stop(self, stop_blocks=EARLY_STOP_BLOCKS, stop_fraction=EARLY_STOP_FRACTION):
+        # Clear last analysis data
+        self.__log = ""
+        self.__results = None
+
+        # Starting log
+        img_path = self.__img.get_path()
+        self.__log += "Steganalysis with Chi-Square method (early stop) for '" + str(img_path) + "'\n"
+
+        # Analysis operation
+        try:
+            r = self.__analyze_early_stop(stop_blocks, stop_fraction)
+            self.__results = r
+        except Exception as ex:
+            self.__log += "X\tCritical error: {0}\n".format(repr(ex))
+            return None
+
+        # Return and write in log results
+        self.__write_results()
+        self.__log += "Scanned {0:.2%} of image; confidence of decision: {1:.2%}\n".format(r.scanned, r.confidence)
+        return self.__results
+
+    # Cumulative Chi square scans in several orders for one pass over image: raster (as 'execute'), column-major,
+    # per-channel (raster) and fixed pseudo-random orders of raster blocks channels (for randomly spread hidden data).
+    # Returns dict of results by orders names: 'raster', 'columns', 'red', 'green', 'blue' and 'random_<seed>'
+    def execute_multi_order(self, random_seeds=MULTI_ORDER_RANDOM_SEEDS, random_steps=MULTI_ORDER_RANDOM_STEPS):
+        # Clear last analysis data
+        self.__log = ""
+
+        # Starting log
+        img_path = self.__img.get_path()
+        self.__log += "Steganalysis with multi-order Chi-Square method for '" + str(img_path) + "'\n"
+
+        # Analysis operation
+        try:
+            results = self.__analyze_multi_order(random_seeds, random_steps)
+        except Exception as ex:
+            self.__log += "X\tCritical error: {0}\n".format(repr(ex))
+            return None
+
+        # Write in log results
+        for order, r in results.items():
+            self.__log += "Fullness in {0} order: {1:.2%}\n".format(order, r.fullness)
+        return results
+
+    # Localises hidden data: independent Chi square tests for every tile of 2-D grids of tiles of given sizes.
+    # Returns list of heatmaps results (for each tile size)
+    def execute_heatmap(self, tile_sizes=HEATMAP_TILE_SIZES):
+        # Clear last analysis data
+        self.__log = ""
+
+        # Starting log
+        img_path = self.__img.get_path()
+        self.__log += "Localisation with Chi-Square method heatmaps for '" + str(img_path) + "'\n"
+
+        # Analysis operation
+        try:
+            return self.__analyze_heatmap(tile_sizes)
+        except Exception as ex:
+            self.__log += "X\tCritical error: {0}\n".format(repr(ex))
+            return None
+
     # Writes results of analysis in log
     def __write_results(self):
         if self.__results is None:
@@ -51,68 +118,226 @@ class ChiSquareMethod:
         self.__log += result
 
     # Main operations of analysis
-    def __analyze(self, visualize):
-        blocks_coords = self.__get_blocks_coords()  # Split into blocks and get they coords
-        cnum = np.ones(RGB_COLOURS, dtype=np.int32)  # Creation of categories array
-
-        fullness = 0
-        vis = np.zeros(shape=self.__imar.shape) if visualize else None
-
-        k = 1
-        for coord in blocks_coords:
-            # Calculation of frequencies of all colors in block
-            block_cnum = self.__calc_colours_by_coord(coord)
-            cnum = [x + y for x, y in zip(cnum, block_cnum)]  # Color number array
-
-            # Creating observed and expected arrays
-            observed, expected = self.__get_chi_arrays(cnum)
-            observed, expected = self.__unify_categories(observed, expected)
+    def __analyze(self, visualize, lazy_visualize):
+        width, height = self.__img.get_size()
+        block_width, block_height = self.__get_block_size(width, height)  # Get blocks size
+        # Calculation of frequencies of all colors in all blocks (they are cached for the image content)
+        blocks_cnums = self.__img.get_cached(("block_histograms", block_width, block_height),
+                                             lambda: self.__calc_blocks_colours(block_width, block_height))
 
-            # Calculation of Chi square test values
-            chi2, p = chi_sqr(observed, expected)
-            fullness += int(p > THRESHOLD)
+        # Color number arrays for all blocks: cumulative sums of blocks colors numbers (each category starts from 1)
+        cnums = np.cumsum(blocks_cnums, axis=0, dtype=np.int64) + 1
 
-            # Colorizing blocks with hidden information
-            if visualize:
-                self.__colorize_block(vis, coord, ImgChannel.RED if p > THRESHOLD else ImgChannel.GREEN)
+        # Calculation of Chi square test values for all blocks at once
+        chi2s, ps = self.__chi_sqr_tests(cnums)
+        hidden_flags = ps > THRESHOLD  # Flags of blocks with detected hidden information
 
+        for k, (chi2, p) in enumerate(zip(chi2s, ps), 1):
             self.__log += "|\t[{0}] chi^2 = {1:.5}; p = {2:.5}\n".format(k, chi2, p)
-            k += 1
 
         # Calculation of container fullness (in percents)
-        fullness /= len(blocks_coords)
+        fullness = np.count_nonzero(hidden_flags) / len(blocks_cnums)
+
+        r = ChiSqrRes(fullness=fullness, visualized=None, p_values=ps, hidden_flags=hidden_flags,
+                      block_size=(block_width, block_height))
+
+        # Colorizing blocks with hidden information
+        img = self.__img
+        if visualize:
+            r.visualized = visualize_chisqr_result(img, r)
+        elif lazy_visualize:
+            r.set_renderer(lambda res: visualize_chisqr_result(img, res))
 
         # Return results
-        r = ChiSqrRes(fullness=fullness, visualized=vis)
         return r
 
-    # Creates observed and expected arrays for chi square test
-    def __get_chi_arrays(self, cnum):
-        observed = []
-        expected = []
-
-        ln = len(cnum) // 2
-        for i in range(ln):
-            new_observed = cnum[2 * i]
-            new_expected = (cnum[2 * i] + cnum[2 * i + 1]) / 2
+    # Scans blocks by strips while decision (cumulative p-value is above threshold or not) is not stable enough
+    def __analyze_early_stop(self, stop_blocks, stop_fraction):
+        width, height = self.__img.get_size()
+        block_width, block_height = self.__get_block_size(width, height)  # Get blocks size
+        blocks_total = -(-width // block_width) * -(-height // block_height)
+
+        # Number of consecutive blocks with the same decision that is enough to stop
+        stop_lens = [n for n in (stop_blocks, int(math.ceil(stop_fraction * blocks_total))) if n > 0]
+        stop_len = min(stop_lens) if len(stop_lens) > 0 else blocks_total
+
+        all_ps = []
+        last_cnum = np.ones(RGB_COLOURS, dtype=np.int64)  # Color number array of all previous blocks
+        run_flag, run_len = None, 0  # Decision of last blocks and number of them
+        stopped = False
+
+        for blocks_cnums in self.__iter_blocks_colours(block_width, block_height):
+            cnums = np.cumsum(blocks_cnums, axis=0, dtype=np.int64) + last_cnum
+            last_cnum = cnums[-1]
+
+            chi2s, ps = self.__chi_sqr_tests(cnums)
+            for chi2, p in zip(chi2s, ps):
+                all_ps.append(p)
+                self.__log += "|\t[{0}] chi^2 = {1:.5}; p = {2:.5}\n".format(len(all_ps), chi2, p)
+
+                is_hidden = p > THRESHOLD
+                run_len = run_len + 1 if is_hidden == run_flag else 1
+                run_flag = is_hidden
+                if run_len >= stop_len:
+                    stopped = True
+                    break
 
-            if new_expected > 0:
-                observed.append(new_observed)
-                expected.append(new_expected)
+            if stopped:
+                break
 
-        return expected, observed
+        ps = np.array(all_ps)
+        hidden_flags = ps > THRESHOLD
 
-    # Calculates color number array for one blocks by the block coords
-    def __calc_colours_by_coord(self, coord):
-        cnum = np.zeros(RGB_COLOURS, dtype=np.int32)
-        deep = self.__imar.shape[2]  # Deep - number of image channels
+        # Confidence: mean distance of p-values of last stable blocks from the opposite decision
+        run_ps = ps[-run_len:]
+        confidence = float(np.mean(run_ps if run_flag else 1 - run_ps))
 
-        for i in range(coord[1][0], coord[1][1] + 1):
-            for j in range(coord[0][0], coord[0][1] + 1):
-                for ch in range(deep):
-                    cnum[int(self.__imar[i][j][ch])] += 1
+        return ChiSqrRes(fullness=np.count_nonzero(hidden_flags) / len(ps), visualized=None, p_values=ps,
+                         hidden_flags=hidden_flags, block_size=(block_width, block_height),
+                         scanned=len(ps) / blocks_total, confidence=confidence)
 
-        return cnum
+    # Calculates colors numbers of steps of all scan orders by strips of image and tests them cumulatively
+    def __analyze_multi_order(self, random_seeds, random_steps):
+        width, height = self.__img.get_size()
+        block_width, block_height = self.__get_block_size(width, height)  # Get blocks size
+        blocks_in_line = -(-width // block_width)
+        blocks_num = blocks_in_line * -(-height // block_height)
+        line_inds = np.arange(width) // block_width  # Index of block in 'line' for each pixels column
+
+        # Column-major blocks: their sizes are defined as for transposed image
+        col_block_height, col_block_width = self.__get_block_size(height, width)
+        blocks_in_column = -(-height // col_block_height)
+        col_blocks_num = blocks_in_column * -(-width // col_block_width)
+        column_inds = (np.arange(width) // col_block_width) * blocks_in_column  # First block of each pixels column
+
+        # Colors numbers of scans steps: raster blocks by channels and column-major blocks
+        blocks_cnums = np.zeros(shape=(blocks_num, 3, RGB_COLOURS), dtype=np.int64)
+        col_blocks_cnums = np.zeros(col_blocks_num * RGB_COLOURS, dtype=np.int64)
+
+        strip_height = block_height * max(1, HISTOGRAM_STRIP_HEIGHT // block_height)  # Whole 'lines' of blocks
+        for row, strip in self.__img.iter_strips(strip_height):
+            rows = row + np.arange(strip.shape[0])
+
+            # Raster blocks of strip (by channels)
+            first_block = (row // block_height) * blocks_in_line
+            block_inds = (rows // block_height - row // block_height)[:, np.newaxis] * blocks_in_line + line_inds
+            values = (block_inds[:, :, np.newaxis] * 3 + np.arange(3)) * RGB_COLOURS + strip
+            strip_blocks_num = -(-strip.shape[0] // block_height) * blocks_in_line
+            strip_cnums = np.bincount(values.ravel(), minlength=strip_blocks_num * 3 * RGB_COLOURS)
+            strip_cnums = strip_cnums.reshape(strip_blocks_num, 3, RGB_COLOURS)
+            blocks_cnums[first_block:first_block + len(strip_cnums)] += strip_cnums
+
+            # Column-major blocks
+            col_block_inds = column_inds + (rows // col_block_height)[:, np.newaxis]
+            values = col_block_inds[:, :, np.newaxis] * RGB_COLOURS + strip
+            col_blocks_cnums += np.bincount(values.ravel(), minlength=len(col_blocks_cnums))
+
+        # Pseudo-random orders: permutations of colors numbers of raster blocks channels (image isn't read again),
+        # steps of scan are equal parts of permutation
+        units_cnums = blocks_cnums.reshape(-1, RGB_COLOURS)
+        step_size = -(-len(units_cnums) // random_steps)
+        steps_starts = np.arange(0, len(units_cnums), step_size)
+        random_cnums = [np.add.reduceat(units_cnums[np.random.default_rng(seed).permutation(len(units_cnums))],
+                                        steps_starts) for seed in random_seeds]
+
+        # Cumulative tests of all orders
+        orders = {"raster": (blocks_cnums.sum(axis=1), (block_width, block_height)),
+                  "columns": (col_blocks_cnums.reshape(-1, RGB_COLOURS), None)}
+        for channel in (ImgChannel.RED, ImgChannel.GREEN, ImgChannel.BLUE):
+            orders[channel.name.lower()] = (blocks_cnums[:, channel.value], (block_width, block_height))
+        for seed, cnums in zip(random_seeds, random_cnums):
+            orders["random_{0}".format(seed)] = (cnums, None)
+
+        results = {}
+        for order, (cnums, block_size) in orders.items():
+            chi2s, ps = self.__chi_sqr_tests(np.cumsum(cnums, axis=0) + 1)
+            hidden_flags = ps > THRESHOLD
+            results[order] = ChiSqrRes(fullness=np.count_nonzero(hidden_flags) / len(ps), visualized=None,
+                                       p_values=ps, hidden_flags=hidden_flags, block_size=block_size)
+
+        return results
+
+    # Independent Chi square tests for all tiles of heatmaps (tiles histograms are got from integral histograms)
+    def __analyze_heatmap(self, tile_sizes):
+        tile_sizes = [(size, size) if isinstance(size, int) else tuple(size) for size in tile_sizes]
+        cell_size = HEATMAP_CELL_SIZE if HEATMAP_CELL_SIZE > 0 else math.gcd(*(s for size in tile_sizes for s in size))
+        if any(s % cell_size != 0 for size in tile_sizes for s in size):
+            raise ValueError("Tiles sizes must be multiples of heatmap cell size")
+
+        integral = self.__get_integral_histograms(cell_size)
+        results = []
+
+        for tile_width, tile_height in tile_sizes:
+            # Histograms of all tiles: tiles bounds in cells are used for integral histograms lookups
+            rows = np.arange(0, integral.shape[0] - 1, tile_height // cell_size)
+            cols = np.arange(0, integral.shape[1] - 1, tile_width // cell_size)
+            rows_end = np.minimum(rows + tile_height // cell_size, integral.shape[0] - 1)
+            cols_end = np.minimum(cols + tile_width // cell_size, integral.shape[1] - 1)
+
+            tiles_cnums = (integral[rows_end][:, cols_end] - integral[rows][:, cols_end]
+                           - integral[rows_end][:, cols] + integral[rows][:, cols])
+
+            # Tests of tiles (each category starts from 1 as for blocks)
+            chi2s, ps = self.__chi_sqr_tests(tiles_cnums.reshape(-1, RGB_COLOURS) + 1)
+            ps = ps.reshape(len(rows), len(cols))
+            hidden_flags = ps > THRESHOLD
+            fullness = np.count_nonzero(hidden_flags) / hidden_flags.size
+
+            self.__log += "|\t[{0}x{1}] tiles grid {2}x{3}: fullness = {4:.2%}\n".format(
+                tile_width, tile_height, len(cols), len(rows), fullness)
+            results.append(ChiSqrMapRes(tile_size=(tile_width, tile_height), p_values=ps,
+                                        hidden_flags=hidden_flags, fullness=fullness))
+
+        return results
+
+    # Returns integral histograms of image by cells: value [i, j] is colors numbers of all cells before i row
+    # and j column of cells grid (they are cached for the image content)
+    def __get_integral_histograms(self, cell_size):
+        width, height = self.__img.get_size()
+        cells_cnums = self.__img.get_cached(("block_histograms", cell_size, cell_size),
+                                            lambda: self.__calc_blocks_colours(cell_size, cell_size))
+        cells_cnums = cells_cnums.reshape(-(-height // cell_size), -(-width // cell_size), RGB_COLOURS)
+
+        integral = np.zeros(shape=(cells_cnums.shape[0] + 1, cells_cnums.shape[1] + 1, RGB_COLOURS), dtype=np.int64)
+        np.cumsum(np.cumsum(cells_cnums, axis=0, dtype=np.int64), axis=1, out=integral[1:, 1:])
+        return integral
+
+    # Calculates Chi square tests for all color number arrays (rows of 'cnums'). Returns chi^2 and p-values arrays
+    def __chi_sqr_tests(self, cnums):
+        # Creating observed and expected arrays (one row per color number array)
+        observed, expected = self.__get_chi_arrays(cnums)
+        observed, expected, _ = unify_categories(observed, expected, UNIFY_CONST)
+
+        return chi_sqr_batch(observed, expected)
+
+    # Creates observed and expected arrays for chi square test for all color number arrays (rows of 'cnums'):
+    # means of pairs of values categories and numbers of even values. Categories with zero means are padding
+    def __get_chi_arrays(self, cnums):
+        pairs_means = (cnums[:, 0::2] + cnums[:, 1::2]) / 2
+        even_nums = np.where(pairs_means > 0, cnums[:, 0::2], 0)
+
+        return np.where(pairs_means > 0, pairs_means, 0), even_nums
+
+    # Calculates color number arrays for all blocks of image (rows of returned matrix in blocks raster order)
+    def __calc_blocks_colours(self, block_width, block_height):
+        return np.concatenate(list(self.__iter_blocks_colours(block_width, block_height))).astype(np.int32)
+
+    # Iterates over color number arrays of blocks by strips of whole 'lines' of blocks (image is read by strips)
+    def __iter_blocks_colours(self, block_width, block_height):
+        width, height = self.__img.get_size()
+        blocks_in_line = -(-width // block_width)  # Number of blocks in one 'line' of blocks
+        strip_height = block_height * max(1, HISTOGRAM_STRIP_HEIGHT // block_height)  # Whole 'lines' of blocks
+
+        line_inds = np.arange(width) // block_width  # Index of block in 'line' for each pixels column
+
+        for row, strip in self.__img.iter_strips(strip_height):
+            # Index of block for each pixel of strip: all values of block are counted in its own 256 categories
+            lines_num = -(-strip.shape[0] // block_height)
+            block_inds = (np.arange(strip.shape[0]) // block_height)[:, np.newaxis] * blocks_in_line + line_inds
+            values = block_inds[:, :, np.newaxis] * RGB_COLOURS + strip
+
+            blocks_num = lines_num * blocks_in_line
+            yield np.bincount(values.ravel(), minlength=blocks_num * RGB_COLOURS).reshape(blocks_num, RGB_COLOURS)
 
     # Defines block sizes by the image sizes and method settings
     def __get_block_size(self, width, height):
@@ -132,106 +357,29 @@ class ChiSquareMethod:
 
         return bsize_width, bsize_height
 
-    # Splits image into blocks and return they coords (as pixel indexes)
-    def __get_blocks_coords(self):
-        blocks_coords = []
-        height, width, deep = self.__imar.shape
 
-        block_width, block_height = self.__get_block_size(width, height)  # Get blocks size
-        w_ind = h_ind = 0  # Pointers for X ans Y axes in pixel matrix
-        h_last = min(block_height - 1, height - 1)  # First block right down Y axis coord
+# Renders image array with colorized blocks by Chi-Square method results: color component of every block
+# is shifted by some offset (red for blocks with detected hidden information and green for others)
+def visualize_chisqr_result(img, chisqr_res, offset=COLOR_OFFSET):
+    img = to_image_handler(img)
+    width, height = img.get_size()
+    block_width, block_height = chisqr_res.block_size
+    blocks_in_line = -(-width // block_width)
 
-        # Calculation of blocks coordinates array
-        while True:
-            w_last = w_ind + block_width - 1
-            if w_last >= width:
-                w_last = width - 1  # Cutoff last X index by the image width
+    flags = np.asarray(chisqr_res.hidden_flags).reshape(-1, blocks_in_line)
+    line_inds = np.arange(width) // block_width  # Index of block in 'line' for each pixels column
+    strip_height = block_height * max(1, HISTOGRAM_STRIP_HEIGHT // block_height)  # Whole 'lines' of blocks
 
-            # Save current block calculated coords
-            blocks_coords.append([(w_ind, w_last), (h_ind, h_last)])
+    vis = np.empty(shape=(height, width, 3), dtype=np.uint8)
+    for row, strip in img.iter_strips(strip_height):
+        vis_strip = vis[row:row + strip.shape[0]]
+        vis_strip[...] = strip
 
-            # Going to next block
-            if w_last == width - 1:  # If 'line' is over
-                w_ind = 0
+        # Color component to shift for every pixel of strip (by flag of its block)
+        pixel_flags = flags[(row + np.arange(strip.shape[0])) // block_height][:, line_inds]
+        channels = np.where(pixel_flags, ImgChannel.RED.value, ImgChannel.GREEN.value)[:, :, np.newaxis]
 
-                if h_last == height - 1:  # ... And it was last 'line' - we spliited whole image
-                    break
+        shifted = np.take_along_axis(strip, channels, axis=2).astype(np.int32) + offset  # Local upcast: uint8 overflow
+        np.put_along_axis(vis_strip, channels, np.minimum(shifted, 255), axis=2)
 
-                # Going to next 'line' of blocks
-                h_ind = h_last + 1
-                h_last = h_ind + block_height - 1
-                if h_last >= height:
-                    h_last = height - 1
-            else:
-                w_ind = w_last + 1  # Going to next block in 'line'
-
-        return blocks_coords
-
-    # Unifies color categories that contains low-frequency values (unifying low-frequency colors in union category)
-    def __unify_categories(self, observed, expected):
-        new_observed = []
-        new_expected = []
-        touni_observed = []
-        touni_expected = []
-
-        # Selecting < UNIFY_CONST values in arrays
-        for i in range(len(expected)):
-            if expected[i] > UNIFY_CONST:  # 'Normal' categories
-                new_expected.append(expected[i])
-                new_observed.append(observed[i])
-            else:  # Categories that needs to be unifying
-                touni_expected.append(expected[i])
-                touni_observed.append(observed[i])
-
-        # Unifying operation
-        stop = False
-        while not stop:
-            stop = True
-
-            # Unifying adjacent categories
-            for i in range(len(touni_expected) // 2):
-                touni_expected[2 * i] += touni_expected[2 * i + 1]
-                touni_expected[2 * i + 1] = -1
-                touni_observed[2 * i] += touni_observed[2 * i + 1]
-                touni_observed[2 * i + 1] = -1
-
-            # Moves big enough categories to all categories
-            for i in range(len(touni_expected)):
-                if touni_expected[i] > UNIFY_CONST:
-                    new_expected.append(touni_expected[i])
-                    touni_expected[i] = -1
-                    new_observed.append(touni_observed[i])
-                    touni_observed[i] = -1
-
-            # Cleaning all deleted from unifying operation categories
-            for i in range(touni_expected.count(-1)):
-                touni_expected.remove(-1)
-                touni_observed.remove(-1)
-
-            # Appending last non-pair category to category with minimum value
-            if len(touni_expected) == 1:
-                if touni_expected[0] > UNIFY_CONST:
-                    new_expected.append(touni_expected[0])
-                    new_observed.append(touni_observed[0])
-                else:
-                    ind = new_expected.index(min(new_expected))
-                    new_expected[ind] += touni_expected[0]
-                    new_observed[ind] += touni_observed[0]
-
-            elif len(touni_expected) > 0:  # Going to next cycle iteration
-                stop = False
-
-        return new_observed, new_expected
-
-    # Colorizes block: shifts color component by some offset
-    def __colorize_block(self, colorized_array, coord, channel, offset=COLOR_OFFSET):
-        for i in range(coord[1][0], coord[1][1] + 1):
-            for j in range(coord[0][0], coord[0][1] + 1):
-                red, green, blue = self.__imar[i][j]
-
-                if channel == ImgChannel.RED:
-                    colorized_array[i][j] = min(red + offset, 255), green, blue
-                elif channel == ImgChannel.GREEN:
-                    colorized_array[i][j] = red, min(green + offset, 255), blue
-                elif channel == ImgChannel.BLUE:
-                    colorized_array[i][j] = red, green, min(blue + offset, 255)
+    return vis
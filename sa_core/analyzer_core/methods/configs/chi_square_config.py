@@ -6,6 +6,19 @@ COLOURS_THRESHOLD = 256
 USE_ONE_PERCENT_BLOCK_SIZE = False  # Enforce to use auto-calculated 1% (of image size) blocks
 BLOCK_WIDTH = 0  # 0 means maximum width (whole line)
 BLOCK_HEIGHT = 1
+HISTOGRAM_STRIP_HEIGHT = 256  # Number of pixels rows for which blocks colors are counted at once
+
+# Heatmap (localisation) settings
+HEATMAP_TILE_SIZES = (32, 64, 128)  # Sizes of tiles (side or (width, height)) with independent Chi-Square tests
+HEATMAP_CELL_SIZE = 0  # Size of integral histograms cell (0 means the greatest common divisor of tiles sizes)
+
+# Early stop (triage) settings: scan is stopped when decision is the same for number of consecutive blocks
+EARLY_STOP_BLOCKS = 64  # Number of consecutive blocks (0 disables the condition)
+EARLY_STOP_FRACTION = 0.1  # Fraction of all image blocks (0 disables the condition)
+
+# Multi-order scans settings
+MULTI_ORDER_RANDOM_SEEDS = (1, 2, 3)  # Seeds of fixed pseudo-random orders of raster blocks channels
+MULTI_ORDER_RANDOM_STEPS = 100  # Number of parts (steps of cumulative scan) of pseudo-random orders
 
 # Chi-Square configs
 THRESHOLD = 0.95  # P-value threshold
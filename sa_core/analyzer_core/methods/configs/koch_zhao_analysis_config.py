@@ -1,3 +1,4 @@
+from sa_core.image_handler import ImgChannel
 from sa_core.sa_math import DctMethod
 
 # Koch-Zhao settings
@@ -6,9 +7,17 @@ CUT_COEFF = 0.2  # Cutoff threshold for difference-between-dct-coeefs values arr
 
 # Frequency representation settings
 DCT_METHOD = DctMethod.SCIPY  # Method of dct and idct calculation
+DCT_BACKEND = None  # Name of DCT backend (None means reference backend, 'auto' - chosen by benchmark)
 BLOCK_SIZE = 8
+STRIP_BLOCKS = 64  # Number of blocks rows of tiled image that are read and transformed at once
 
 DCT_COEFFICIENTS = ((3, 4), (4, 3))  # Coefficients for extracting
 
+# Sweep (all channels and coefficients pairs) settings
+SWEEP_CHANNELS = (ImgChannel.RED, ImgChannel.GREEN, ImgChannel.BLUE)  # Analyzed channels
+SWEEP_PAIRS = None  # Analyzed pairs of coefficients (None means all symmetric pairs ((i, j), (j, i)) of block)
+SWEEP_LUMA = False  # Analyze luma of image too
+LUMA_WEIGHTS = (0.299, 0.587, 0.114)  # Weights of channels in luma (ITU-R BT.601)
+
 # Log settings
 LOGFILE_NAME = "log_KzaMethod.txt"
@@ -1,6 +1,23 @@
 # RS method settings
 PIXELS_IN_GROUP = 4  # Length of base pixel groups
 FLIPPING_MASK = (1, 0, 0, 1)  # Mask for flipping
+MASK_2X2 = ((1, 0), (0, 1))  # Mask for flipping of 2x2 spatial groups
+MASK_3X3 = ((0, 1, 0), (1, 0, 1), (0, 1, 0))  # Mask for flipping of 3x3 spatial groups
+FLIPPING_MASKS = (FLIPPING_MASK,)  # Masks used by default (linear or 2-D): volume is averaged by all of them
+PIXEL_VALUES = 256  # Number of values of one pixel channel (size of flipping lookup tables)
+
+# Execution settings (executor is chosen by image size if it is not set)
+THREADS_MIN_PIXELS = 1024 * 1024  # Images with less pixels are calculated inline (in current thread)
+PROCESSES_MIN_PIXELS = 16 * 1024 * 1024  # Images with more pixels are calculated in separate processes
+THREADS_POOL_SIZE = 6  # Number of threads of shared threads pool (one for each channel and direction)
+
+# Sampling (estimation by subset of image rows) settings
+SAMPLE_BATCH_BANDS = 64  # Number of bands of rows sampled at once (and number of image strata)
+SAMPLE_INTERVAL_WIDTH = 0.02  # Sampling stops when confidence interval of volume is narrower
+SAMPLE_CONFIDENCE = 0.95  # Confidence level of volume interval
+SAMPLE_MAX_FRACTION = 1.0  # Maximum sampled part of image bands
+SAMPLE_BOOTSTRAPS = 200  # Number of bootstrap resamples for confidence interval
+SAMPLE_SEED = 0  # Seed of random sampling (fixed: results are reproducible)
 
 # Log settings
 LOGFILE_NAME = "log_RsMethod.txt"
@@ -0,0 +1,7 @@
+# Sample Pairs method settings
+HORIZONTAL_PAIRS = True  # Use pairs of horizontally adjacent pixels (in rows)
+VERTICAL_PAIRS = True  # Use pairs of vertically adjacent pixels (in columns)
+STRIP_HEIGHT = 256  # Number of pixels rows for which pairs are counted at once
+
+# Log settings
+LOGFILE_NAME = "log_SpaMethod.txt"
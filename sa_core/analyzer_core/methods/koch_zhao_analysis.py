@@ -1,20 +1,19 @@
-from math import fabs
+import numpy as np
 
 from sa_core.image_handler import *
-from sa_core.sa_math import dct
 from sa_core.stego_module import KochZhaoExtractor as KzEx
-from sa_core.stego_module.common_funcs import f_get_dif_of_modules, f_get_blocks, f_get_block_coeffs
+from sa_core.stego_module.common_funcs import f_iter_dct_blocks, f_get_image_dct_blocks, f_get_blocks, \
+    f_get_dct_blocks
 
 from .configs.koch_zhao_analysis_config import *
-from ._result_structs import KzaRes
+from ._result_structs import KzaRes, KzaCandidate
 
 
 # Realize steganalysis of Koch-Zhao method
 class KochZhaoAnalysisMethod:
     def __init__(self, path):
-        self.__img = ImageHandler()
-        self.__img.load(path)
-        self.__imar = self.__img.get_array()
+        # Image can be passed as path, image bytes, file-like object, pixels array or ImageHandler instance
+        self.__img = to_image_handler(path)
 
         self.__log = ""
         self.__results = None
@@ -54,6 +53,34 @@ class KochZhaoAnalysisMethod:
         # Return all results
         return self.__results
 
+    # Sweep of all channels and symmetric pairs of DCT coefficients (instead of blue channel and three pairs).
+    # DCT of each channel is calculated once (strip by strip) for all pairs. Returns list of candidates
+    # (channel, pair of coefficients, threshold and interval) ranked by threshold in descending order
+    def execute_sweep(self, channels=SWEEP_CHANNELS, pairs=SWEEP_PAIRS, luma=SWEEP_LUMA):
+        # Clear last analysis data
+        self.__results = None
+        self.__log = ""
+
+        # Starting log
+        path = self.__img.get_path()
+        self.__log += "Steganalysis with Koch-Zhao Analysis sweep for '" + str(path) + "'\n"
+
+        # Analysis operation
+        try:
+            candidates = self.__analyze_sweep(channels, pairs, luma)
+        except Exception as ex:
+            self.__log += "X\tCritical error: {0}\n".format(repr(ex))
+            return None
+
+        # Write in log results
+        for c in candidates:
+            self.__log += "|\t[{0} {1}] threshold = {2:.2f}, interval: from {3} to {4}\n".format(
+                c.channel, c.coeffs, c.threshold, c.indexes[0], c.indexes[1])
+        suspicious = sum(1 for c in candidates if c.threshold > THRESHOLD)
+        self.__log += "Detected suspicious candidates: {0} of {1}\n".format(suspicious, len(candidates))
+
+        return candidates
+
     # Writes results of analysis in log
     def __write_results(self):
         if self.__results is None:
@@ -78,57 +105,39 @@ class KochZhaoAnalysisMethod:
 
     # Main operations of analysis
     def __analyze(self):
-        img_array = self.__img.get_blue()  # Working with blue channel only
+        c_parts = {"C1": [], "C2": [], "C3": []}  # Parts (for each strip of blocks) of coefficients differences
 
-        c_seq = {"C1": [], "C2": [], "C3": []}  # Sequences of coefficients differences
-        interval_start_indexes = {"C1": 0, "C2": 0, "C3": 0}  # Indexes of beginning of founded intervals
-        d_seq = {}  # Sequences of c_seq values differences
-
-        # Split all pixels in channel into blocks
-        blocks = f_get_blocks(img_array, BLOCK_SIZE)
-
-        for block in blocks:
-            dct_block = dct(block, DCT_METHOD)  # Calc dct for block: getting frequency representation
+        # Split all pixels in channel into blocks (working with blue channel only) and calc dct for blocks:
+        # getting frequency representation
+        if self.__img.is_tiled():  # Image is read by strips of blocks rows, all blocks of strip are transformed at once
+            strips = (strip for row, strip in self.__img.iter_strips(BLOCK_SIZE * STRIP_BLOCKS, ImgChannel.BLUE))
+            dct_strips = f_iter_dct_blocks(strips, BLOCK_SIZE, DCT_METHOD, DCT_BACKEND)
+        else:  # DCT blocks are cached and can be reused by extractor
+            dct_strips = [f_get_image_dct_blocks(self.__img, BLOCK_SIZE, DCT_METHOD, dct_backend=DCT_BACKEND)]
 
+        for dct_blocks in dct_strips:
             # Calculation of difference between dct coefficients in all possible pairs of indexes
-            c_seq["C1"].append(self.__get_module_dif(dct_block, ((2, 3), (3, 2))))
-            c_seq["C2"].append(self.__get_module_dif(dct_block, ((2, 4), (4, 2))))
-            c_seq["C3"].append(self.__get_module_dif(dct_block, ((3, 4), (4, 3))))
-
-        # Getting suspicious interval (interval of high c_seq values)
-        for key in c_seq:
-            il, ir = self.__get_interval(c_seq[key])  # Getting interval indexes
-
-            # Expanding borders if it possible
-            il = il - 1 if il > 0 else il
-            ir = ir + 2 if ir < len(c_seq[key]) - 2 else ir
+            c_parts["C1"].append(self.__get_module_dif(dct_blocks, ((2, 3), (3, 2))))
+            c_parts["C2"].append(self.__get_module_dif(dct_blocks, ((2, 4), (4, 2))))
+            c_parts["C3"].append(self.__get_module_dif(dct_blocks, ((3, 4), (4, 3))))
 
-            # Truncation of c_seq array in accordance with interval
-            c_seq[key] = c_seq[key][il:ir]
-            interval_start_indexes[key] = il  # Saving start index of interval (in original c_seq)
-
-            # Calculation of d_seq only by interval values
-            d_seq[key] = [c_seq[key][0]]
-            for i in range(1, len(c_seq[key])):
-                d_seq[key].append(fabs(c_seq[key][i] - c_seq[key][i - 1]))
-            d_seq[key].append(c_seq[key][len(c_seq[key]) - 1])
+        # Getting suspicious intervals (intervals of high c_seq values)
+        intervals = dict()
+        for key in c_parts:
+            intervals[key] = self.__analyze_sequence(np.concatenate(c_parts[key]))
+            if intervals[key] is None:
+                raise ValueError("Interval of high values of {0} sequence is empty".format(key))
 
         # Calculation of supposed thresholds
         thresholds, indexes = [], []
-        for key in c_seq:
-            # Truncation of expanded interval to clearly high-values interval
-            r = self.__find_two_maxs(d_seq[key])
-            r[1] -= 1
+        for key in intervals:
+            M0, ind, r, seq = intervals[key]
 
             # Getting threshold value and definition of final interval indexes
-            if len(r) < 2 or len(c_seq[key][r[0]:r[1] + 1]) < 8:  # There not hidden data
-                M0 = 0.0  # Threshold value
+            if ind is None:  # There not hidden data
                 self.__log += "|\t[{0}] {1} doesn't contains needed sequence\n".format(key, key)
-                ind = None
             else:  # Can suppose that img contains hidden data
-                M0 = min(c_seq[key][r[0]:r[1]])  # Threshold value: minimum of c_seq (difference of coeffs) value
-                self.__log += "|\t[{0}] SEQ = {1}\n".format(key, c_seq[key][r[0]:r[1] + 1])
-                ind = (interval_start_indexes[key] + r[0], interval_start_indexes[key] + r[1])
+                self.__log += "|\t[{0}] SEQ = {1}\n".format(key, seq.tolist())
 
             # Saving threshold and indexes by this pair of dct coefficients
             thresholds.append(M0)
@@ -151,52 +160,119 @@ class KochZhaoAnalysisMethod:
         r = KzaRes(threshold=threshold, indexes=indexes, volume=volume, data=None)
         return r
 
-    # Returns abs of difference between coefficients abs
-    def __get_module_dif(self, block, indexes):
-        bc = f_get_block_coeffs(block, indexes)
-        dif = f_get_dif_of_modules(bc[0], bc[1])
-        return fabs(dif)
+    # Sweep analysis: coefficients differences of all pairs are calculated for each strip of blocks by one DCT
+    # of each channel, then suspicious interval is searched in each sequence
+    def __analyze_sweep(self, channels, pairs, luma):
+        if pairs is None:
+            pairs = self.__get_symmetric_pairs(BLOCK_SIZE)
+        pairs_indexes = np.array(pairs)  # (pairs, 2 coefficients, 2 indexes)
+
+        # Coefficients differences by channels: parts (pairs, strip blocks) for each strip of blocks
+        names = [channel.name for channel in channels] + (["LUMA"] if luma else [])
+        c_parts = {name: [] for name in names}
+        for row, strip in self.__img.iter_strips(BLOCK_SIZE * STRIP_BLOCKS):
+            for name, array in self.__iter_sweep_arrays(strip, channels, luma):
+                dct_blocks = f_get_dct_blocks(f_get_blocks(array, BLOCK_SIZE), DCT_METHOD, DCT_BACKEND)
+                c_parts[name].append(self.__get_module_dif(dct_blocks, pairs_indexes.transpose(1, 2, 0)).T)
+
+        # Searching suspicious intervals in sequences of all channels and pairs
+        candidates = []
+        for name in names:
+            c_seqs = np.concatenate(c_parts[name], axis=1)
+            for pair, c_seq in zip(pairs, c_seqs):
+                interval = self.__analyze_sequence(c_seq)
+                if interval is None or interval[1] is None:
+                    continue
+
+                M0, ind = interval[0], interval[1]
+                threshold = M0 - 0.5 if M0 > 0.5 else M0
+                volume = ind[1] - ind[0] + 1 if threshold > THRESHOLD else 0
+                candidates.append(KzaCandidate(channel=name, coeffs=tuple(map(tuple, pair)), threshold=threshold,
+                                               indexes=ind, volume=volume))
+
+        # Ranking of candidates by threshold
+        candidates.sort(key=lambda c: c.threshold, reverse=True)
+        return candidates
+
+    # Yields channels arrays of strip for sweep analysis (and luma array if it is needed) with their names
+    def __iter_sweep_arrays(self, strip, channels, luma):
+        for channel in channels:
+            yield channel.name, strip[:, :, channel.value]
+        if luma:
+            yield "LUMA", strip[:, :, :3] @ np.array(LUMA_WEIGHTS)
+
+    # Returns all symmetric pairs of coefficients of block: ((i, j), (j, i)) for i < j
+    def __get_symmetric_pairs(self, block_size):
+        return [((i, j), (j, i)) for i in range(block_size) for j in range(i + 1, block_size)]
+
+    # Searches suspicious interval in sequence of coefficients differences. Returns threshold value M0 (minimum
+    # of interval values), interval indexes in sequence, interval bounds in expanded interval and interval values
+    # (threshold is 0.0 and indexes are None if there is no needed interval). Returns None for empty interval
+    def __analyze_sequence(self, c_seq):
+        il, ir = self.__get_interval(c_seq)  # Getting interval indexes
+
+        # Expanding borders if it possible
+        il = il - 1 if il > 0 else il
+        ir = ir + 2 if ir < len(c_seq) - 2 else ir
+
+        # Truncation of c_seq array in accordance with interval (il is start index of interval in original c_seq)
+        c_seq = c_seq[il:ir]
+        if len(c_seq) == 0:
+            return None
+
+        # Calculation of d_seq only by interval values: first value, differences of adjacent values, last value
+        d_seq = np.concatenate((c_seq[:1], np.abs(np.diff(c_seq)), c_seq[-1:]))
+
+        # Truncation of expanded interval to clearly high-values interval
+        r = self.__find_two_maxs(d_seq)
+        r[1] -= 1
 
-    # Returns the longest interval of high values in sequence
+        if len(r) < 2 or len(c_seq[r[0]:r[1] + 1]) < 8:  # There not hidden data
+            return 0.0, None, r, None
+
+        M0 = float(c_seq[r[0]:r[1]].min())  # Threshold value: minimum of c_seq (difference of coeffs) value
+        return M0, (il + r[0], il + r[1]), r, c_seq[r[0]:r[1] + 1]
+
+    # Returns abs of difference between coefficients abs for all blocks of array of blocks
+    # (indexes can be arrays of indexes: then differences of all pairs are returned as (blocks, pairs) array)
+    def __get_module_dif(self, blocks, indexes):
+        (i1, j1), (i2, j2) = indexes
+        dif = np.abs(blocks[:, i1, j1]) - np.abs(blocks[:, i2, j2])
+        return np.abs(dif)
+
+    # Returns the longest interval of high values in sequence: interval of values that are not less than part
+    # (CUT_COEFF) of maximum value and are followed by low value (interval at the end of sequence isn't counted).
+    # If there are no such intervals returns indexes next to the last low value
     def __get_interval(self, seq):
-        smax = max(seq)
-        trsh = smax * CUT_COEFF
-
-        # Truncation of all sequence values
-        aseq = seq.copy()
-        for i in range(len(aseq)):
-            if aseq[i] < trsh:
-                aseq[i] = 0.0
-
-        # Getting all intervals
-        sq_inds = []
-        il, ir = 0, 0
-        for i in range(len(aseq)):
-            if aseq[i] == 0.0:
-                ir = i
-                if ir - il > 0:
-                    sq_inds.append((il, ir - 1))
-                il = i + 1
-
-        # Choosing the longest interval
-        if len(sq_inds) > 0:
-            sizes = [j - i + 1 for (i, j) in sq_inds]
-            max_size = max(sizes)
-            il, ir = sq_inds[sizes.index(max_size)]
-
-        # Return coords of the longest interval
-        return il, ir
-
-    # Returns two maximum sequence values in order left to right
+        trsh = seq.max() * CUT_COEFF
+
+        # Indexes of all low (truncated) values: they are ends of intervals
+        lows = np.flatnonzero((seq < trsh) | (seq == 0.0))
+        if len(lows) == 0:
+            return 0, 0
+
+        # Getting all intervals: from value after previous low value to value before current low value
+        starts = np.concatenate(([0], lows[:-1] + 1))
+        sizes = lows - starts
+
+        # Choosing the longest interval (the first of longest ones)
+        if np.any(sizes > 0):
+            i = int(np.argmax(sizes))
+            return int(starts[i]), int(lows[i] - 1)
+
+        # There are no intervals: coords next to the last low value
+        return int(lows[-1] + 1), int(lows[-1])
+
+    # Returns indexes of two maximum sequence values in order left to right (the first occurrences of values,
+    # so both indexes are the same if maximum is repeated)
     def __find_two_maxs(self, d):
         # Get first value
-        m = max(d)
-        il = d.index(m)
+        il = int(np.argmax(d))
 
         # Get second value
-        # d[il] = -1
-        m = max(d[:il] + [-1] + d[il+1:])
-        ir = d.index(m)
+        masked = d.copy()
+        masked[il] = -1
+        ir = int(np.argmax(d == masked.max()))
 
         if il < ir:
             return [il, ir]
@@ -1,4 +1,4 @@
 # Contains parts of algorithms or calculations that are needed for steganalysis methods
 
-from .rs_calc import rs_calc_mp, RsCalc
+from .rs_calc import rs_calc_mp, rs_calc_shared, get_mask_groups_shape, RsCalc
 from .rs_group_type import RsGroupType
@@ -1,83 +1,190 @@
+import numpy as np
+
 from sa_core.image_handler import *
+from sa_core.sa_lib.shared_array import SharedArray
 from ..configs.regular_singular_config import *
-from .rs_group_type import RsGroupType
 
 
-# RsCalc multiprocessing wrapper
-def rs_calc_mp(q, img_array, channel):
-    rs_calc = RsCalc(img_array, channel)
-    res = rs_calc.exec()
-    q.put(res)
+# RsCalc multiprocessing wrapper: image array is attached from shared memory by its meta-data
+def rs_calc_mp(q, img_array_meta, channel, masks=FLIPPING_MASKS):
+    q.put(rs_calc_shared(img_array_meta, channel, masks))
+
+
+# Executes RsCalc for image array from shared memory (can be submitted to processes pool)
+def rs_calc_shared(img_array_meta, channel, masks=FLIPPING_MASKS):
+    shared_array = SharedArray().attach(img_array_meta)
+    res = RsCalc(shared_array.get_array(), channel, masks).exec()  # All array views are released before closing
+    shared_array.close()
+    return res
+
+
+# Returns shape of groups of mask (height, width): linear masks (1-D) form groups of one row
+def get_mask_groups_shape(mask):
+    mask = np.asarray(mask)
+    return (1, len(mask)) if mask.ndim == 1 else mask.shape
 
 
 # Execute calculation of values counts in RS groups for one pixels array
+# (or for iterable of pixels array strips in rows order - then image is processed strip by strip).
+# Masks can be linear (groups of adjacent pixels of row) or 2-D (spatial groups, pixels are ordered by 'snake'
+# scan: odd rows of group are reversed). Groups are extracted once for all masks of the same shape.
+# Returns values counts (regulars, singulars, inverted regulars, inverted singulars) for each mask
 class RsCalc:
-    def __init__(self, img_array, channel):
+    def __init__(self, img_array, channel, masks=FLIPPING_MASKS):
         self.__img_array = img_array
         self.__channel = channel
+        self.__masks = masks
 
     def exec(self):
         return self.__do_one_rs()
 
-    # Main RS groups calculation method
-    def __do_one_rs(self):
-        img_array = self.__img_array
-        channel = self.__channel
-
-        local_img = ImageHandler()
-        local_img.set_array(img_array)
+    # Calculates values counts for each band of 'band_height' rows of image array separately (groups don't cross
+    # bands, rows tails are skipped: band height must be multiple of masks heights).
+    # Returns (bands number, masks number, 4) array of values counts
+    def exec_by_bands(self, band_height):
+        channel_array = self.__get_channel_strips()[0]
+        bands_num = channel_array.shape[0] // band_height
+        counts = np.zeros(shape=(bands_num, len(self.__masks), 4), dtype=np.int64)
 
-        channel_array = local_img.get_channel_array(channel)
-        regulars = singulars = inv_regulars = inv_singulars = 0
+        for shape, shape_masks in self.__get_shapes().items():
+            groups, bands = self.__get_band_groups(channel_array[:bands_num * band_height], shape, band_height)
+            group_func = self.__regularity_func(groups)
 
-        groups = self.__get_groups(channel_array)
-        mask_funcs = self.__get_mask_funcs(FLIPPING_MASK)
-        inv_mask_funcs = self.__get_mask_funcs(self.__invert_mask(FLIPPING_MASK))
+            for i, mask_luts, inv_mask_luts in shape_masks:
+                for j, luts in ((0, mask_luts), (2, inv_mask_luts)):
+                    flipped_func = self.__regularity_func(self.__flip(groups, luts))
+                    counts[:, i, j] = np.bincount(bands[flipped_func > group_func], minlength=bands_num)
+                    counts[:, i, j + 1] = np.bincount(bands[flipped_func < group_func], minlength=bands_num)
 
-        for group in groups:
-            v = self.__get_func_values(group, mask_funcs)
-            group_type = self.__get_group_type(v[0], v[1])
-            if group_type == RsGroupType.REGULAR:
-                regulars += 1
-            elif group_type == RsGroupType.SINGULAR:
-                singulars += 1
-
-            v = self.__get_func_values(group, inv_mask_funcs)
-            group_type = self.__get_group_type(v[0], v[1])
-            if group_type == RsGroupType.REGULAR:
-                inv_regulars += 1
-            elif group_type == RsGroupType.SINGULAR:
-                inv_singulars += 1
-
-        return regulars, singulars, inv_regulars, inv_singulars
-
-    # Split all pixels into groups
-    def __get_groups(self, channel_array):
-        groups = []
-        excess = []
+        return counts
 
+    # Main RS groups calculation method
+    def __do_one_rs(self):
+        counts = [[0, 0, 0, 0] for mask in self.__masks]
+        shapes = self.__get_shapes()
+
+        excesses = {shape: self.__get_empty_excess(shape) for shape in shapes}  # Pixels left over from last strips
+
+        for channel_array in self.__get_channel_strips():
+            for shape, shape_masks in shapes.items():
+                groups, excesses[shape] = self.__get_shape_groups(channel_array, excesses[shape], shape)
+                group_func = self.__regularity_func(groups)
+
+                for i, mask_luts, inv_mask_luts in shape_masks:
+                    flipped_func = self.__regularity_func(self.__flip(groups, mask_luts))
+                    r, s = self.__count_group_types(group_func, flipped_func)
+                    counts[i][0] += r
+                    counts[i][1] += s
+
+                    flipped_func = self.__regularity_func(self.__flip(groups, inv_mask_luts))
+                    r, s = self.__count_group_types(group_func, flipped_func)
+                    counts[i][2] += r
+                    counts[i][3] += s
+
+        return [tuple(mask_counts) for mask_counts in counts]
+
+    # Returns channel arrays of all image strips (whole image array is the one strip)
+    def __get_channel_strips(self):
+        if isinstance(self.__img_array, np.ndarray):
+            local_img = ImageHandler()
+            local_img.set_array(self.__img_array)
+            return [local_img.get_channel_array(self.__channel)]
+
+        return (strip[:, :, self.__channel.value] for strip in self.__img_array)
+
+    # Returns masks by shapes of groups: (height, width) -> list of (mask index, flipping tables,
+    # inverted flipping tables)
+    def __get_shapes(self):
+        shapes = dict()
+        for i, mask in enumerate(self.__masks):
+            shape, linear_mask = self.__get_mask_shape(mask)
+            shapes.setdefault(shape, []).append(
+                (i, self.__get_mask_luts(linear_mask), self.__get_mask_luts(self.__invert_mask(linear_mask))))
+
+        return shapes
+
+    # Returns shape of groups of mask (height, width) and mask values in order of group pixels
+    def __get_mask_shape(self, mask):
+        mask = np.array(mask)
+        if mask.ndim == 1:
+            return get_mask_groups_shape(mask), list(mask)
+
+        return get_mask_groups_shape(mask), list(self.__snake_order(mask[np.newaxis])[0])
+
+    # Returns empty excess for groups of shape: pixels for linear groups and rows for spatial ones
+    def __get_empty_excess(self, shape):
+        height, width = shape
+        if height == 1:
+            return np.empty(0, dtype=np.int16)
+        return None
+
+    # Split all pixels of strip into groups of shape - (groups number, pixels in group) array
+    def __get_shape_groups(self, channel_array, excess, shape):
+        height, width = shape
+        if height == 1:
+            return self.__get_groups(channel_array, excess, width)
+        return self.__get_spatial_groups(channel_array, excess, height, width)
+
+    # Split all pixels into linear groups - (groups number, group size) array. Pixels at the ends of rows which
+    # don't form whole group are joined (in rows order) with pixels left over from previous rows (excess)
+    # into groups, and the rest is returned as new excess
+    def __get_groups(self, channel_array, excess, group_size=PIXELS_IN_GROUP):
         ln = channel_array.shape[1]
-        for str in channel_array:
-            for i in [i * PIXELS_IN_GROUP for i in range(ln // PIXELS_IN_GROUP)]:
-                group = []
-                for j in range(PIXELS_IN_GROUP):
-                    group.append(str[i + j])
-                groups.append(group)
-
-            for i in range((ln // PIXELS_IN_GROUP) * PIXELS_IN_GROUP, ln):
-                excess.append(str[i])
-            if len(excess) >= PIXELS_IN_GROUP:
-                groups.append(excess[:PIXELS_IN_GROUP])
-                excess = excess[PIXELS_IN_GROUP:]
-
-        return groups
-
-    # Regularity (smooth) function
-    def __regularity_func(self, nums):
-        sum = 0
-        for i in range(len(nums) - 1):
-            sum += abs(nums[i + 1] - nums[i])
-        return sum
+        in_row = (ln // group_size) * group_size  # Pixels of whole groups of each row
+
+        # Local upcast: differences and flipping of uint8 values can overflow (int16 is enough for them)
+        groups = channel_array[:, :in_row].astype(np.int16).reshape(-1, group_size)
+
+        excess = np.concatenate((excess, channel_array[:, in_row:].astype(np.int16).ravel()))
+        in_excess = (len(excess) // group_size) * group_size
+        if in_excess > 0:
+            groups = np.concatenate((groups, excess[:in_excess].reshape(-1, group_size)))
+
+        return groups, excess[in_excess:]
+
+    # Split all pixels into spatial groups (height x width) - (groups number, height * width) array in 'snake' order.
+    # Rows that don't form whole groups are left over for next strip (excess), columns at the right edge are skipped
+    def __get_spatial_groups(self, channel_array, excess, height, width):
+        if excess is not None:
+            channel_array = np.concatenate((excess, channel_array))
+
+        rows = (channel_array.shape[0] // height) * height
+        cols = (channel_array.shape[1] // width) * width
+
+        # Local upcast: differences and flipping of uint8 values can overflow (int16 is enough for them)
+        tiles = channel_array[:rows, :cols].astype(np.int16).reshape(rows // height, height, cols // width, width)
+        groups = self.__snake_order(tiles.transpose(0, 2, 1, 3).reshape(-1, height, width))
+
+        excess = channel_array[rows:] if rows < channel_array.shape[0] else None
+        return groups, excess
+
+    # Split all pixels of bands into groups of shape (without excess) and returns groups with band index of each group
+    def __get_band_groups(self, channel_array, shape, band_height):
+        height, width = shape
+        groups_in_row = channel_array.shape[1] // width
+
+        if height == 1:
+            groups = channel_array[:, :groups_in_row * width].astype(np.int16).reshape(-1, width)
+            bands = np.repeat(np.arange(channel_array.shape[0]) // band_height, groups_in_row)
+        else:
+            groups, excess = self.__get_spatial_groups(channel_array, None, height, width)
+            bands = np.repeat(np.arange(0, channel_array.shape[0], height) // band_height, groups_in_row)
+
+        return groups, bands
+
+    # Orders pixels of 2-D groups (groups number, height, width) in 'snake' order: odd rows are reversed
+    def __snake_order(self, groups):
+        groups = groups.copy()
+        groups[:, 1::2] = groups[:, 1::2, ::-1]
+        return groups.reshape(len(groups), groups.shape[1] * groups.shape[2])
+
+    # Regularity (smooth) function for all groups: sum of absolute differences of adjacent pixels
+    # (it is summed by groups columns: it is much faster than summing along short rows)
+    def __regularity_func(self, groups):
+        func = np.zeros(len(groups), dtype=groups.dtype)
+        for i in range(groups.shape[1] - 1):
+            func += np.abs(groups[:, i + 1] - groups[:, i])
+        return func
 
     # Function of direct flipping
     def __flip_direct(self, val):
@@ -98,8 +205,8 @@ class RsCalc:
         val = int(val)
         return val
 
-    # Composes list of flipping functions by the chosen mask
-    def __get_mask_funcs(self, mask=FLIPPING_MASK):
+    # Composes list of flipping lookup tables (results of flipping functions for all values) by the chosen mask
+    def __get_mask_luts(self, mask=FLIPPING_MASK):
         f_mask = []
         for e in mask:
             if e == 1:
@@ -109,33 +216,22 @@ class RsCalc:
             elif e == -1:
                 f_mask.append(self.__flip_back)
 
-        return f_mask
+        return [np.array([f(val) for val in range(PIXEL_VALUES)], dtype=np.int16) for f in f_mask]
 
-    # Applying flipping functions to one group
-    def __group_flipping(self, group, mask_funcs):
-        flipped = []
-        for i in range(PIXELS_IN_GROUP):
-            flipped.append(mask_funcs[i](group[i]))
+    # Applying flipping lookup tables to all groups (each group pixel has its own table)
+    def __flip(self, groups, mask_luts):
+        flipped = np.empty_like(groups)
+        for i in range(groups.shape[1]):
+            flipped[:, i] = mask_luts[i][groups[:, i]]
 
         return flipped
 
-    # Definition of group type
-    def __get_group_type(self, func, flipped_func):
-        if flipped_func > func:
-            return RsGroupType.REGULAR
-        if flipped_func < func:
-            return RsGroupType.SINGULAR
-        if flipped_func == func:
-            return RsGroupType.UNUSABLE
+    # Definition of groups types: returns numbers of regular and singular groups (others are unusable)
+    def __count_group_types(self, func, flipped_func):
+        regulars = np.count_nonzero(flipped_func > func)  # RsGroupType.REGULAR
+        singulars = np.count_nonzero(flipped_func < func)  # RsGroupType.SINGULAR
+        return int(regulars), int(singulars)
 
     # Inverts mask
     def __invert_mask(self, mask=FLIPPING_MASK):
         return [e * -1 for e in mask]
-
-    # Calc regularity function values for original and flipped groups
-    def __get_func_values(self, group, mask_funcs):
-        flipped_group = self.__group_flipping(group, mask_funcs)
-        group_func = self.__regularity_func(group)
-        flipped_group_func = self.__regularity_func(flipped_group)
-
-        return group_func, flipped_group_func
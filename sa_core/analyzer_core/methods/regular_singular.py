@@ -1,19 +1,61 @@
+import math
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from decimal import *
+from enum import Enum
 from multiprocessing import Process, Queue
 
+import numpy as np
+
 from sa_core.image_handler import *
+from sa_core.sa_lib.shared_array import SharedArray
 
 from .configs.regular_singular_config import *
 from ._result_structs import RsRes
-from .partial import rs_calc_mp
+from .partial import rs_calc_mp, rs_calc_shared, get_mask_groups_shape, RsCalc
+
+
+# Variants of execution of RS groups calculations (for each channel and direction)
+class RsExecutor(Enum):
+    INLINE = 0  # One by one in current thread
+    THREADS = 1  # In shared threads pool
+    PROCESSES = 2  # In separate processes (image arrays are passed through shared memory)
+
+
+_threads_pool = None
+_threads_pool_lock = threading.Lock()
+
+
+# Returns threads pool that is shared by all RS methods (it is created on first use)
+def get_rs_threads_pool():
+    global _threads_pool
+    with _threads_pool_lock:
+        if _threads_pool is None:
+            _threads_pool = ThreadPoolExecutor(max_workers=THREADS_POOL_SIZE, thread_name_prefix="rs_calc")
+        return _threads_pool
+
+
+# Threads of pool don't exist in forked child process: pool (and its lock) is created again there on first use
+def _reset_rs_threads_pool():
+    global _threads_pool, _threads_pool_lock
+    _threads_pool = None
+    _threads_pool_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):  # POSIX only
+    os.register_at_fork(after_in_child=_reset_rs_threads_pool)
 
 
 # Realize Regular-Singular steganalysis method
 class RegularSingularMethod:
-    def __init__(self, path):
-        self.__img = ImageHandler()
-        self.__img.load(path)
-        self.__imar = self.__img.get_array()
+    # Executor can be RsExecutor variant or injected pool (concurrent.futures.Executor, e.g. ProcessPoolExecutor).
+    # By default it is chosen by image size. Masks are flipping masks (linear or 2-D) used in one pass over image
+    def __init__(self, path, executor=None, masks=FLIPPING_MASKS):
+        # Image can be passed as path, image bytes, file-like object, pixels array or ImageHandler instance
+        self.__img = to_image_handler(path)
+        self.__executor = executor
+        self.__masks = masks
 
         self.__log = ""
         self.__results = None
@@ -22,6 +64,14 @@ class RegularSingularMethod:
     def get_log(self):
         return self.__log
 
+    # Sets executor of RS groups calculations (None means choice by image size)
+    def set_executor(self, executor):
+        self.__executor = executor
+
+    # Sets flipping masks (linear or 2-D) for RS groups calculations
+    def set_masks(self, masks):
+        self.__masks = masks
+
     def execute(self):
         # Clear last analysis data
         self.__results = None
@@ -43,6 +93,33 @@ class RegularSingularMethod:
         self.__write_results()
         return self.__results
 
+    # Estimation of volume by random (stratified) subsets of bands of image rows: bands are sampled by batches
+    # until bootstrap confidence interval of volume is narrower than 'interval_width' (or 'max_fraction' of image
+    # is sampled). Results contain volume, its confidence interval and sampled part of image
+    def execute_sampled(self, interval_width=SAMPLE_INTERVAL_WIDTH, confidence=SAMPLE_CONFIDENCE,
+                        max_fraction=SAMPLE_MAX_FRACTION, seed=SAMPLE_SEED):
+        # Clear last analysis data
+        self.__results = None
+        self.__log = ""
+
+        # Starting log
+        path = self.__img.get_path()
+        self.__log += "Steganalysis with sampled Regular-Singular method for '" + str(path) + "'\n"
+
+        # Analysis operation
+        try:
+            r = self.__analyze_sampled(interval_width, confidence, max_fraction, seed)
+            self.__results = r
+        except Exception as ex:
+            self.__log += "X\tCritical error: {0}\n".format(repr(ex))
+            return None
+
+        # Return and write in log results
+        self.__write_results()
+        self.__log += "Confidence interval ({0:.0%}): [{1:.2%}, {2:.2%}]; sampled {3:.2%} of image\n".format(
+            confidence, r.interval[0], r.interval[1], r.sampled)
+        return self.__results
+
     # Writes results of analysis in log
     def __write_results(self):
         if self.__results is None:
@@ -53,61 +130,233 @@ class RegularSingularMethod:
 
     # Main operations of analysis
     def __analyze(self):
-        avg_fullness = k = 0
+        # Calculation of RS groups values for each image channel
+        executor = self.__get_executor()
+        if isinstance(executor, ProcessPoolExecutor):
+            calc_res = self.__calc_in_processes_pool(executor)
+        elif isinstance(executor, Executor):
+            calc_res = self.__calc_in_pool(executor)
+        elif self.__img.is_tiled():
+            calc_res = self.__calc_by_strips()
+        elif executor == RsExecutor.THREADS:
+            calc_res = self.__calc_in_pool(get_rs_threads_pool())
+        elif executor == RsExecutor.PROCESSES:
+            calc_res = self.__calc_mp()
+        else:
+            calc_res = self.__calc_inline()
 
-        # Multiprocessing operations data
-        d_queues = dict()
-        i_queues = dict()
-        calcs = []
+        # Calculation of analysis results (for each mask)
+        masks_volumes = []
+        for i, mask in enumerate(self.__masks):
+            if len(self.__masks) > 1:
+                self.__log += "|\tMask: {0}\n".format(mask)
 
-        # Get image array where inverted all LSB
-        inverted_img_array = self.__img.invert_lsb()
+            avg_fullness = k = 0
+            for channel in ImgChannel:
+                self.__log += "|\tChannel: {0}\n".format(channel.name)  # Writing each channel result to log
 
-        # Calculation of RS result value for each image channel - launching calc processes (RsCalc)
-        for channel in ImgChannel:
-            d_queues[channel.name] = Queue()
-            i_queues[channel.name] = Queue()
+                # Calc observed volume of hidden data
+                p = self.__get_p(calc_res[channel.name][0][i], calc_res[channel.name][1][i])
+                avg_fullness += p
+                k += 1
 
-            direct_calc = Process(target=rs_calc_mp, args=(d_queues[channel.name], self.__img.get_array(), channel,))
-            invert_calc = Process(target=rs_calc_mp, args=(i_queues[channel.name], inverted_img_array, channel,))
+            masks_volumes.append(avg_fullness / k)
 
-            calcs.append(direct_calc)
-            calcs.append(invert_calc)
+        # Calculation of single result: combined by all masks
+        r = RsRes(volume=sum(masks_volumes) / len(masks_volumes), masks_volumes=masks_volumes)
+
+        return r
 
-            direct_calc.start()
-            invert_calc.start()
+    # Sampling of bands of rows by batches with bootstrap estimation of volume confidence interval
+    def __analyze_sampled(self, interval_width, confidence, max_fraction, seed):
+        width, height = self.__img.get_size()
+
+        # Bands of rows: they are sampling units (their height is multiple of heights of all masks groups)
+        band_height = 1
+        for mask in self.__masks:
+            mask_height = get_mask_groups_shape(mask)[0]  # The same groups shape as in RsCalc
+            band_height = band_height * mask_height // math.gcd(band_height, mask_height)
+        bands_num = height // band_height
+        if bands_num == 0:
+            raise ValueError("Image height ({0}) is less than height of band of rows ({1}) needed by masks: "
+                             "sampled analysis isn't possible, use full analysis".format(height, band_height))
+        max_bands = max(1, min(bands_num, int(math.ceil(max_fraction * bands_num))))
+
+        rng = np.random.default_rng(seed)
+        bands_order = self.__get_stratified_order(bands_num, SAMPLE_BATCH_BANDS, rng)
+
+        # Values counts of sampled bands: (bands, channels, directions, masks, 4)
+        bands_counts = []
+        sampled = 0
+        while True:
+            batch = bands_order[sampled:min(sampled + SAMPLE_BATCH_BANDS, max_bands)]
+            sampled += len(batch)
+
+            # Only rows of sampled bands are read (whole image array isn't needed in tiled mode)
+            batch_array = np.concatenate([self.__img.get_rows(band * band_height, (band + 1) * band_height)
+                                          for band in batch])
+            batch_inverted = batch_array ^ batch_array.dtype.type(1)
+            bands_counts.append(np.stack([np.stack([RsCalc(array, channel, self.__masks).exec_by_bands(band_height)
+                                                    for array in (batch_array, batch_inverted)], axis=1)
+                                          for channel in ImgChannel], axis=1))
+
+            counts = np.concatenate(bands_counts)
+            volume, masks_volumes = self.__get_sampled_volume(counts.sum(axis=0))
+            interval = self.__get_bootstrap_interval(counts, confidence, rng)
+
+            self.__log += "|\tSampled bands: {0}; volume = {1:.5}; interval = [{2:.5}, {3:.5}]\n".format(
+                sampled, float(volume), interval[0], interval[1])
+            if interval[1] - interval[0] <= interval_width or sampled >= max_bands:
+                break
+
+        return RsRes(volume=volume, masks_volumes=masks_volumes, interval=interval, sampled=sampled / bands_num)
+
+    # Returns bands order for sampling: each batch of 'batch_size' bands takes one random band from each
+    # of 'batch_size' equal strata of image (rows ranges)
+    def __get_stratified_order(self, bands_num, batch_size, rng):
+        strata = np.arange(bands_num) * batch_size // bands_num
+
+        # Random rank of each band in its stratum
+        shuffled = np.lexsort((rng.random(bands_num), strata))
+        ranks = np.empty(bands_num, dtype=np.intp)
+        ranks[shuffled] = np.arange(bands_num) - np.searchsorted(strata, strata[shuffled])
+
+        return np.lexsort((strata, ranks))
+
+    # Calculation of volume (and volumes of masks) by values counts: (channels, directions, masks, 4)
+    def __get_sampled_volume(self, counts):
+        masks_volumes = []
+        for i in range(len(self.__masks)):
+            channels_p = [self.__get_p(counts[ch, 0, i].tolist(), counts[ch, 1, i].tolist(), log=False)
+                          for ch in range(len(ImgChannel))]
+            masks_volumes.append(sum(channels_p) / len(channels_p))
+
+        return sum(masks_volumes) / len(masks_volumes), masks_volumes
+
+    # Percentile bootstrap confidence interval of volume: sampled bands are resampled with replacement
+    def __get_bootstrap_interval(self, counts, confidence, rng):
+        weights = rng.multinomial(len(counts), np.full(len(counts), 1 / len(counts)), size=SAMPLE_BOOTSTRAPS)
+        resampled = np.tensordot(weights, counts, axes=1)  # Values counts of all resamples
+
+        volumes = [float(self.__get_sampled_volume(res_counts)[0]) for res_counts in resampled]
+        tail = (1 - confidence) / 2
+        return float(np.quantile(volumes, tail)), float(np.quantile(volumes, 1 - tail))
+
+    # Returns executor of calculations: the cheapest one for image size if it is not set
+    def __get_executor(self):
+        if self.__executor is not None:
+            return self.__executor
+
+        width, height = self.__img.get_size()
+        if width * height < THREADS_MIN_PIXELS:
+            return RsExecutor.INLINE
+        if width * height < PROCESSES_MIN_PIXELS:
+            return RsExecutor.THREADS
+        return RsExecutor.PROCESSES
+
+    # Calculation of RS groups values one by one in current thread
+    def __calc_inline(self):
+        img_array, inverted_array = self.__img.get_array(read_only=True), self.__img.invert_lsb(read_only=True)
 
-        # Getting all RS groups values calculation results
         calc_res = dict()
         for channel in ImgChannel:
-            calc_res[channel.name] = (d_queues[channel.name].get(), i_queues[channel.name].get())
+            calc_res[channel.name] = (RsCalc(img_array, channel, self.__masks).exec(),
+                                      RsCalc(inverted_array, channel, self.__masks).exec())
 
-        # Waiting for ending of all calculation processes
-        for calc in calcs:
-            calc.join()
+        return calc_res
 
-        # Calculation of analysis results
+    # Calculation of RS groups values in threads pool (arrays are shared by threads)
+    def __calc_in_pool(self, pool):
+        img_array, inverted_array = self.__img.get_array(read_only=True), self.__img.invert_lsb(read_only=True)
+
+        futures = dict()
         for channel in ImgChannel:
-            self.__log += "|\tChannel: {0}\n".format(channel.name)  # Writing each channel result to log
+            futures[channel.name] = (pool.submit(RsCalc(img_array, channel, self.__masks).exec),
+                                     pool.submit(RsCalc(inverted_array, channel, self.__masks).exec))
 
-            # Calc observed volume of hidden data
-            p = self.__get_p(calc_res[channel.name][0], calc_res[channel.name][1])
-            avg_fullness += p
-            k += 1
+        return {name: (direct.result(), invert.result()) for name, (direct, invert) in futures.items()}
 
-        # Calculation of single result
-        avg_fullness /= k
-        r = RsRes(volume=avg_fullness)
+    # Calculation of RS groups values in processes pool (arrays are passed through shared memory)
+    def __calc_in_processes_pool(self, pool):
+        shared_array = SharedArray().create(self.__img.get_array(read_only=True))
+        shared_inverted = SharedArray().create(self.__img.invert_lsb(read_only=True))
 
-        return r
+        try:
+            futures = dict()
+            for channel in ImgChannel:
+                futures[channel.name] = (pool.submit(rs_calc_shared, shared_array.get_meta(), channel, self.__masks),
+                                         pool.submit(rs_calc_shared, shared_inverted.get_meta(), channel, self.__masks))
+
+            calc_res = {name: (direct.result(), invert.result()) for name, (direct, invert) in futures.items()}
+        finally:
+            shared_array.unlink()
+            shared_inverted.unlink()
+
+        return calc_res
+
+    # Calculation of RS groups values in separate processes (for whole image array)
+    def __calc_mp(self):
+        # Multiprocessing operations data
+        d_queues = dict()
+        i_queues = dict()
+        calcs = []
+
+        # Publishing image array and image array where inverted all LSB into shared memory:
+        # calc processes attach to them instead of receiving pickled copies
+        shared_array = SharedArray().create(self.__img.get_array(read_only=True))
+        shared_inverted = SharedArray().create(self.__img.invert_lsb(read_only=True))
+
+        try:
+            # Calculation of RS result value for each image channel - launching calc processes (RsCalc)
+            for channel in ImgChannel:
+                d_queues[channel.name] = Queue()
+                i_queues[channel.name] = Queue()
+
+                direct_calc = Process(target=rs_calc_mp,
+                                      args=(d_queues[channel.name], shared_array.get_meta(), channel, self.__masks,))
+                invert_calc = Process(target=rs_calc_mp,
+                                      args=(i_queues[channel.name], shared_inverted.get_meta(), channel, self.__masks,))
+
+                calcs.append(direct_calc)
+                calcs.append(invert_calc)
+
+                direct_calc.start()
+                invert_calc.start()
+
+            # Getting all RS groups values calculation results
+            calc_res = dict()
+            for channel in ImgChannel:
+                calc_res[channel.name] = (d_queues[channel.name].get(), i_queues[channel.name].get())
+
+            # Waiting for ending of all calculation processes
+            for calc in calcs:
+                calc.join()
+        finally:
+            shared_array.unlink()
+            shared_inverted.unlink()
+
+        return calc_res
+
+    # Calculation of RS groups values strip by strip in current process (whole image array is not created)
+    def __calc_by_strips(self):
+        calc_res = dict()
+        for channel in ImgChannel:
+            strips = (strip for row, strip in self.__img.iter_strips())
+            inverted_strips = (strip ^ strip.dtype.type(1) for row, strip in self.__img.iter_strips())
+            calc_res[channel.name] = (RsCalc(strips, channel, self.__masks).exec(),
+                                      RsCalc(inverted_strips, channel, self.__masks).exec())
+
+        return calc_res
 
     # Calculation of 'p' value - relative volume of hidden data - by the RS groups values
-    def __get_p(self, direct_values, invert_values):
+    def __get_p(self, direct_values, invert_values, log=True):
         # Writing to log info about RS groups values
-        out_vars = ['RM(p/2)', 'SM(p/2)', 'R_M(p/2)', 'S_M(p/2)', 'RM(1-p/2)', 'SM(1-p/2)', 'R_M(1-p/2)', 'S_M(1-p/2)']
-        out_values = [*direct_values, *invert_values]
-        out_line = "".join(["|\t\t{0}: {1}\n".format(out_vars[i], out_values[i]) for i in range(8)])
-        self.__log += out_line
+        if log:
+            out_vars = ['RM(p/2)', 'SM(p/2)', 'R_M(p/2)', 'S_M(p/2)', 'RM(1-p/2)', 'SM(1-p/2)', 'R_M(1-p/2)',
+                        'S_M(1-p/2)']
+            out_values = [*direct_values, *invert_values]
+            out_line = "".join(["|\t\t{0}: {1}\n".format(out_vars[i], out_values[i]) for i in range(8)])
+            self.__log += out_line
 
         #
         # Main calc operation
@@ -117,7 +366,8 @@ class RegularSingularMethod:
         d1 = invert_values[0] - invert_values[1]
         d1i = invert_values[2] - invert_values[3]
 
-        self.__log += "|\t\td0 = {0}; d0i = {1}; d1 = {2}; d1i = {3}\n".format(d0, d0i, d1, d1i)
+        if log:
+            self.__log += "|\t\td0 = {0}; d0i = {1}; d1 = {2}; d1i = {3}\n".format(d0, d0i, d1, d1i)
 
         a = (d1 + d0) * 2
         b = d0i - d1i - d1 - 3 * d0
@@ -125,10 +375,12 @@ class RegularSingularMethod:
 
         D = Decimal(b ** 2 - 4 * a * c)
 
-        if D < 0:
+        if a == 0:  # Equation is linear
+            x1 = x2 = min_x = Decimal(-c) / Decimal(b) if b != 0 else Decimal(0)
+        elif D < 0:
             x1 = x2 = min_x = 0
         elif D == 0:
-            x1 = x2 = min_x = - (b / 2 * a)
+            x1 = x2 = min_x = Decimal(-b) / Decimal(2 * a)  # Double root
         else:
             x1 = Decimal((-b + Decimal.sqrt(D)) / (2 * a))
             x2 = Decimal((-b - Decimal.sqrt(D)) / (2 * a))
@@ -140,8 +392,9 @@ class RegularSingularMethod:
 
         p = Decimal(min_x / (min_x - Decimal(0.5)))
 
-        self.__log += "|\t\ta = {0}; b = {1}; c = {2}; D = {3}\n".format(a, b, c, D)
-        self.__log += ("|\t\tx1 = {0:.5}; x2 = {1:.5}; min_x = {2:.5}; p = {3:.5}\n"
-                       .format(float(x1), float(x2), float(min_x), p))
+        if log:
+            self.__log += "|\t\ta = {0}; b = {1}; c = {2}; D = {3}\n".format(a, b, c, D)
+            self.__log += ("|\t\tx1 = {0:.5}; x2 = {1:.5}; min_x = {2:.5}; p = {3:.5}\n"
+                           .format(float(x1), float(x2), float(min_x), p))
 
         return max(p, Decimal(0.0))
@@ -0,0 +1,116 @@
+import math
+
+import numpy as np
+
+from sa_core.image_handler import *
+
+from .configs.sample_pairs_config import *
+from ._result_structs import SpaRes
+
+
+# Realize Sample Pairs Analysis steganalysis method (fast estimation of LSB embedding rate)
+class SamplePairsMethod:
+    def __init__(self, path):
+        # Image can be passed as path, image bytes, file-like object, pixels array or ImageHandler instance
+        self.__img = to_image_handler(path)
+
+        self.__log = ""
+        self.__results = None
+
+    # Returns log of last analysis
+    def get_log(self):
+        return self.__log
+
+    def execute(self):
+        # Clear last analysis data
+        self.__results = None
+        self.__log = ""
+
+        # Starting log
+        path = self.__img.get_path()
+        self.__log += "Steganalysis with Sample Pairs Analysis method for '" + str(path) + "'\n"
+
+        # Analysis operation
+        try:
+            r = self.__analyze()
+            self.__results = r
+        except Exception as ex:
+            self.__log += "X\tCritical error: {0}\n".format(repr(ex))
+            return None
+
+        # Return and write in log results
+        self.__write_results()
+        return self.__results
+
+    # Writes results of analysis in log
+    def __write_results(self):
+        if self.__results is None:
+            return
+
+        result = "Detected volume of hidden message: {0:.2%}\n".format(self.__results.volume)
+        self.__log += result
+
+    # Main operations of analysis
+    def __analyze(self):
+        channels_volumes = []
+        for channel in ImgChannel:
+            self.__log += "|\tChannel: {0}\n".format(channel.name)  # Writing each channel result to log
+
+            # Calc observed volume of hidden data
+            channels_volumes.append(self.__get_p(self.__count_pairs(channel)))
+
+        r = SpaRes(volume=sum(channels_volumes) / len(channels_volumes), channels_volumes=channels_volumes)
+        return r
+
+    # Counts sets of adjacent pixels pairs (u, v) of channel strip by strip (vertical pairs on strips borders are
+    # formed with last row of previous strip). Returns counts of pairs: X (v is even and u < v or v is odd and u > v),
+    # Z (u = v), W (u and v differ only in LSB) and P (all pairs). Y set is the rest of pairs: Y = P - X - Z
+    def __count_pairs(self, channel):
+        x = z = w = p = 0
+        last_row = None
+        for row, strip in self.__img.iter_strips(STRIP_HEIGHT, channel):
+            # Local upcast: comparison and XOR of pixels values must not overflow
+            strip = strip.astype(np.int16)
+
+            pairs = []
+            if HORIZONTAL_PAIRS:
+                pairs.append((strip[:, :-1], strip[:, 1:]))
+            if VERTICAL_PAIRS:
+                rows = strip if last_row is None else np.concatenate((last_row, strip))
+                pairs.append((rows[:-1], rows[1:]))
+            last_row = strip[-1:]
+
+            for u, v in pairs:
+                v_odd = (v & 1).astype(bool)
+                x += int(np.count_nonzero(np.where(v_odd, u > v, u < v)))
+                z += int(np.count_nonzero(u == v))
+                w += int(np.count_nonzero((u ^ v) == 1))
+                p += u.size
+
+        return x, p - x - z, z, w, p
+
+    # Calculation of 'p' value - relative volume of hidden data - by the pairs counts: it is the smaller root of
+    # (W + Z) / 2 * p^2 + (2X - P) * p + Y - X = 0
+    def __get_p(self, pairs_counts):
+        x, y, z, w, p = pairs_counts
+        self.__log += "|\t\tX: {0}; Y: {1}; Z: {2}; W: {3}; P: {4}\n".format(x, y, z, w, p)
+
+        a = (w + z) / 2
+        b = 2 * x - p
+        c = y - x
+
+        D = b ** 2 - 4 * a * c
+
+        if a == 0:  # Equation is linear
+            x1 = x2 = min_x = -c / b if b != 0 else 0.0
+        elif D < 0:
+            x1 = x2 = min_x = 0.0
+        else:
+            x1 = (-b + math.sqrt(D)) / (2 * a)
+            x2 = (-b - math.sqrt(D)) / (2 * a)
+            min_x = min(x1, x2)
+
+        self.__log += "|\t\ta = {0}; b = {1}; c = {2}; D = {3}\n".format(a, b, c, D)
+        self.__log += "|\t\tx1 = {0:.5}; x2 = {1:.5}; p = {2:.5}\n".format(float(x1), float(x2), float(min_x))
+
+        return min(max(min_x, 0.0), 1.0)
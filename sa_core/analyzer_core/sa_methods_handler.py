@@ -1,11 +1,14 @@
+import os
 from dataclasses import dataclass
 from multiprocessing import Process, Queue
 
 from .methods import ChiSquareMethod as ChiSqrMethod, RegularSingularMethod as RsMethod, \
-    KochZhaoAnalysisMethod as KzaMethod
-from .methods import ChiSqrRes, RsRes, KzaRes
+    KochZhaoAnalysisMethod as KzaMethod, SamplePairsMethod as SpaMethod
+from .methods import ChiSqrRes, RsRes, KzaRes, SpaRes, visualize_chisqr_result
 from ._analyzer_params import AnalyzerParams
+from sa_core.image_handler import ImageHandler, to_image_handler
 from sa_core.sa_lib.timer import Timer
+from sa_core.sa_lib.shared_array import SharedArray
 
 
 # Can contains results of all methods
@@ -14,27 +17,57 @@ class MethodsResult:
     ChiSqrResult: ChiSqrRes
     RsResult: RsRes
     KzaResult: KzaRes
+    SpaResult: SpaRes = None
+
+
+# Creates image handler for image array from shared memory (shared array must be alive while handler is used)
+def get_shared_image(shared_array, img_path):
+    img = ImageHandler()
+    img.set_array(shared_array.get_array(), path=img_path)
+    return img
 
 
 # Chi Square method multiprocessing wrapper
-def mp_chisqr(q, img, chisqr_visualize):
-    chisqr = ChiSqrMethod(img)
+def mp_chisqr(q, img_array_meta, img_path, chisqr_visualize):
+    shared_array = SharedArray().attach(img_array_meta)
+    chisqr = ChiSqrMethod(get_shared_image(shared_array, img_path))
     chisqr_res = chisqr.execute(visualize=chisqr_visualize)
+
+    # Visualized image array is returned through shared memory (block is destroyed by receiver)
+    visualized_meta = None
+    if chisqr_res is not None and chisqr_res.visualized is not None:
+        shared_visualized = SharedArray().create(chisqr_res.visualized)
+        visualized_meta = shared_visualized.get_meta()
+        shared_visualized.close()
+        chisqr_res.visualized = None
+
     q.put(chisqr_res)
+    q.put(visualized_meta)
     q.put(chisqr.get_log())
 
 
 # Regular-Singular method multiprocessing wrapper
-def mp_rs(q, img):
-    rs = RsMethod(img)
+def mp_rs(q, img_array_meta, img_path):
+    shared_array = SharedArray().attach(img_array_meta)
+    rs = RsMethod(get_shared_image(shared_array, img_path))
     rs_res = rs.execute()
     q.put(rs_res)
     q.put(rs.get_log())
 
 
+# Sample Pairs Analysis method multiprocessing wrapper
+def mp_spa(q, img_array_meta, img_path):
+    shared_array = SharedArray().attach(img_array_meta)
+    spa = SpaMethod(get_shared_image(shared_array, img_path))
+    spa_res = spa.execute()
+    q.put(spa_res)
+    q.put(spa.get_log())
+
+
 # Koch-Zhao analysis method multiprocessing wrapper
-def mp_kza(q, img, kza_extract):
-    kza = KzaMethod(img)
+def mp_kza(q, img_array_meta, img_path, kza_extract):
+    shared_array = SharedArray().attach(img_array_meta)
+    kza = KzaMethod(get_shared_image(shared_array, img_path))
     kza_res = kza.execute(try_extract=kza_extract)
     q.put(kza_res)
     q.put(kza.get_log())
@@ -42,17 +75,19 @@ def mp_kza(q, img, kza_extract):
 
 # Steganalysis executor that union all analysis methods
 class SaMethodsHandler:
-    def __init__(self, img_path=None, do_chisqr=True, do_rs=True, do_kza=True, chisqr_visualize=True, kza_extract=True):
-        self.__img_path = self.__do_chisqr = self.__do_rs = self.__do_kza = None
-        self.__chisqr_visualize = self.__kza_extract = None
+    def __init__(self, img_path=None, do_chisqr=True, do_rs=True, do_kza=True, chisqr_visualize=True, kza_extract=True,
+                 chisqr_lazy_visualize=False, do_spa=False):
+        self.__img_path = self.__do_chisqr = self.__do_rs = self.__do_kza = self.__do_spa = None
+        self.__chisqr_visualize = self.__kza_extract = self.__chisqr_lazy_visualize = None
         self.__global_out = False
         self.__chisqr_res = __rs_res = __kza_res = None
-        self.set_params(img_path, do_chisqr, do_rs, do_kza, chisqr_visualize, kza_extract)
+        self.set_params(img_path, do_chisqr, do_rs, do_kza, chisqr_visualize, kza_extract, chisqr_lazy_visualize,
+                        do_spa)
 
         self.__log = ""
         self.__all_logs = self.__get_empty_logs()  # Contains this handler log and all methods logs
         self.__duration = 0.0  # Elapsed time for all operations
-        self.__chisqr_res = self.__rs_res = self.__kza_res = None
+        self.__chisqr_res = self.__rs_res = self.__kza_res = self.__spa_res = None
 
     # Returns log of last analysis
     def get_log(self):
@@ -61,10 +96,13 @@ class SaMethodsHandler:
     # Set all analyzer parameters via AnalyzerParams structure
     def set(self, params: AnalyzerParams):
         self.set_params(params.img, params.do_chisqr, params.do_rs, params.do_kza,
-                        params.chisqr_visualize, params.kza_extract)
+                        params.chisqr_visualize, params.kza_extract, params.chisqr_lazy_visualize, params.do_spa)
 
-    # Set any analyzer parameters
-    def set_params(self, img_path=None, do_chisqr=None, do_rs=None, do_kza=None, chisqr_visualize=None, kza_extract=None):
+    # Set any analyzer parameters. If 'chisqr_lazy_visualize' is True Chi Square method process returns only
+    # compact blocks results and visualized image array is rendered on first access to it.
+    # 'do_spa' enables Sample Pairs Analysis method (fast estimation of LSB hidden message volume)
+    def set_params(self, img_path=None, do_chisqr=None, do_rs=None, do_kza=None, chisqr_visualize=None, kza_extract=None,
+                   chisqr_lazy_visualize=None, do_spa=None):
         if img_path is not None:
             self.__img_path = img_path
         if do_chisqr is not None:
@@ -77,10 +115,15 @@ class SaMethodsHandler:
             self.__chisqr_visualize = chisqr_visualize
         if kza_extract is not None:
             self.__kza_extract = kza_extract
+        if chisqr_lazy_visualize is not None:
+            self.__chisqr_lazy_visualize = chisqr_lazy_visualize
+        if do_spa is not None:
+            self.__do_spa = do_spa
 
     def exec(self):
         if self.__img_path is None:
-            raise ValueError("img_path must be correct string path to an image file")
+            raise ValueError("img_path must be path to an image file, image bytes, file-like object, "
+                             "pixels array or ImageHandler instance")
 
         # Clear last analysis data
         self.__clear_results()
@@ -89,7 +132,7 @@ class SaMethodsHandler:
 
         # Starting log
         self.__log = ("For {0} steganalysis operations was launched\n"
-                      .format(self.__img_path))
+                      .format(self.__get_img_name()))
 
         # Starting timer
         timer = Timer()
@@ -107,7 +150,7 @@ class SaMethodsHandler:
         self.__duration = timer.get_time_count()
 
         self.__log += ("For {0} steganalysis operations was done in {1:.3f} s\n"
-                       .format(self.__img_path, self.__duration))
+                       .format(self.__get_img_name(), self.__duration))
         self.__all_logs["handler"] = self.__log
 
         # Return result
@@ -126,48 +169,92 @@ class SaMethodsHandler:
         if self.__img_path is None:
             return None
 
-        # Creating and launching all steganalysis methods processes
-        processes = []
-        if self.__do_chisqr:  # Chi Square method analysis
-            chisqr_q = Queue()
-            chisqr_proc = Process(target=mp_chisqr,
-                                  args=(chisqr_q, self.__img_path, self.__chisqr_visualize,))
-            processes.append(chisqr_proc)
-            chisqr_proc.start()
-
-        if self.__do_rs:  # Regular-Singular method analysis
-            rs_q = Queue()
-            rs_proc = Process(target=mp_rs, args=(rs_q, self.__img_path,))
-            processes.append(rs_proc)
-            rs_proc.start()
-
-        if self.__do_kza:  # Koch-Zhao analysis method
-            kza_q = Queue()
-            kza_proc = Process(target=mp_kza, args=(kza_q, self.__img_path, self.__kza_extract,))
-            processes.append(kza_proc)
-            kza_proc.start()
-
-        # Getting results of work of all methods
-        if self.__do_chisqr:
-            self.__chisqr_res = chisqr_q.get()
-            self.__all_logs["chi_sqr"] = chisqr_q.get()
-        if self.__do_rs:
-            self.__rs_res = rs_q.get()
-            self.__all_logs["rs"] = rs_q.get()
-        if self.__do_kza:
-            self.__kza_res = kza_q.get()
-            self.__all_logs["kza"] = kza_q.get()
-
-        # Waiting for ending of work of all methods
-        for proc in processes:
-            proc.join()
+        # Decoding image only once and publishing its array into shared memory for all methods processes
+        img = to_image_handler(self.__img_path)
+        shared_array = SharedArray().create(img.get_array(read_only=True))
+        img_array_meta = shared_array.get_meta()
+        img_path = img.get_path()  # Only image name is passed to processes (not image source)
+        lazy_visualize = self.__chisqr_visualize and self.__chisqr_lazy_visualize
+        render_img = img if lazy_visualize else None  # Loaded image is kept only for lazy visualization
+        del img
+
+        try:
+            # Creating and launching all steganalysis methods processes
+            processes = []
+            if self.__do_chisqr:  # Chi Square method analysis
+                chisqr_q = Queue()
+                chisqr_proc = Process(target=mp_chisqr,
+                                      args=(chisqr_q, img_array_meta, img_path,
+                                            self.__chisqr_visualize and not lazy_visualize,))
+                processes.append(chisqr_proc)
+                chisqr_proc.start()
+
+            if self.__do_rs:  # Regular-Singular method analysis
+                rs_q = Queue()
+                rs_proc = Process(target=mp_rs, args=(rs_q, img_array_meta, img_path,))
+                processes.append(rs_proc)
+                rs_proc.start()
+
+            if self.__do_spa:  # Sample Pairs Analysis method
+                spa_q = Queue()
+                spa_proc = Process(target=mp_spa, args=(spa_q, img_array_meta, img_path,))
+                processes.append(spa_proc)
+                spa_proc.start()
+
+            if self.__do_kza:  # Koch-Zhao analysis method
+                kza_q = Queue()
+                kza_proc = Process(target=mp_kza, args=(kza_q, img_array_meta, img_path, self.__kza_extract,))
+                processes.append(kza_proc)
+                kza_proc.start()
+
+            # Getting results of work of all methods
+            if self.__do_chisqr:
+                self.__chisqr_res = chisqr_q.get()
+                self.__receive_visualized(chisqr_q.get())
+                self.__all_logs["chi_sqr"] = chisqr_q.get()
+            if self.__do_rs:
+                self.__rs_res = rs_q.get()
+                self.__all_logs["rs"] = rs_q.get()
+            if self.__do_spa:
+                self.__spa_res = spa_q.get()
+                self.__all_logs["spa"] = spa_q.get()
+            if self.__do_kza:
+                self.__kza_res = kza_q.get()
+                self.__all_logs["kza"] = kza_q.get()
+
+            # Waiting for ending of work of all methods
+            for proc in processes:
+                proc.join()
+        finally:
+            shared_array.unlink()
+
+        # Visualized image array is rendered from already loaded image only when it is needed
+        if lazy_visualize and self.__chisqr_res is not None:
+            self.__chisqr_res.set_renderer(lambda res: visualize_chisqr_result(render_img, res))
 
         # Return results
         return self.get_results()
 
+    # Copies visualized image array of Chi Square method from shared memory and destroys the block
+    def __receive_visualized(self, visualized_meta):
+        if visualized_meta is None:
+            return
+
+        shared_visualized = SharedArray().attach(visualized_meta)
+        self.__chisqr_res.visualized = shared_visualized.get_array().copy()
+        shared_visualized.unlink()
+
+    # Returns name of analyzed image for logs
+    def __get_img_name(self):
+        if isinstance(self.__img_path, (str, os.PathLike)):
+            return self.__img_path
+        if isinstance(self.__img_path, ImageHandler) and self.__img_path.get_path() is not None:
+            return self.__img_path.get_path()
+        return "<in-memory image>"
+
     # Returns results of last stanalysis operations
     def get_results(self):
-        result = MethodsResult(self.__chisqr_res, self.__rs_res, self.__kza_res)
+        result = MethodsResult(self.__chisqr_res, self.__rs_res, self.__kza_res, self.__spa_res)
         return result
 
     # Cleans up all results
@@ -175,7 +262,8 @@ class SaMethodsHandler:
         self.__chisqr_res = None
         self.__rs_res = None
         self.__kza_res = None
+        self.__spa_res = None
 
     # Returns empty logs dict
     def __get_empty_logs(self):
-        return {"chi_sqr": None, "rs": None, "kza": None, "handler": None}
+        return {"chi_sqr": None, "rs": None, "spa": None, "kza": None, "handler": None}
@@ -1,5 +1,5 @@
 # Class for working with images
 
-from .image_handler import ImgChannel, ImageHandler
+from .image_handler import ImgChannel, ImageHandler, to_image_handler
 
-__all__ = ['ImgChannel', 'ImageHandler']
+__all__ = ['ImgChannel', 'ImageHandler', 'to_image_handler']
@@ -1,8 +1,31 @@
+import hashlib
+import io
+import os
+import struct
+import tempfile
+import warnings
+import weakref
 import numpy as np
 from enum import Enum
 
 from PIL import Image
 
+from sa_core.sa_lib.data_cache import get_data_cache
+
+DEFAULT_STRIP_HEIGHT = 256  # Height (in pixels rows) of image strips read in tiled mode
+
+# Uncompressed pixels layouts which are read by rows directly from file in tiled mode:
+# Pillow raw mode -> (bytes per pixel, indexes of red, green and blue bytes in pixel)
+RAW_MODES = {
+    "RGB": (3, (0, 1, 2)),
+    "BGR": (3, (2, 1, 0)),
+    "RGBA": (4, (0, 1, 2)),
+    "RGBX": (4, (0, 1, 2)),
+    "BGRA": (4, (2, 1, 0)),
+    "BGRX": (4, (2, 1, 0)),
+    "L": (1, (0, 0, 0)),
+}
+
 
 # Color channels for RGB-mode
 class ImgChannel(Enum):
@@ -14,49 +37,268 @@ class ImgChannel(Enum):
 class ImageHandler:
     __errors_prefix = "ImageHandler Error"
 
-    def __init__(self):
+    def __init__(self, dtype=np.uint8, tiled=False):
+        self.__dtype = dtype  # Type of pixels array elements (uint8 by default, wider types can be chosen)
+        self.__tiled = tiled  # Tiled mode: methods read pixels by strips or tiles instead of whole image array
         self.__path = None
+        self.__hash = None  # Hash of image file content (key of image data in process-wide data cache)
+        self.__data = None  # Encoded image bytes (if image was loaded from bytes)
         self.__image = None
+        self.__image_closer = None  # Finalizer that closes image file (it is kept open while pixels aren't decoded)
+        self.__source = None  # Rows source of tiled mode (uncompressed image file or cache file)
+        self.__temp_cache = None  # Finalizer that removes temporary cache file of tiled mode
         self.__array = None
+        self.__shared = False  # Array is read-only array shared by handlers of the same content (from data cache)
+        self.__detached = False  # Array may be changed by user: derived data isn't taken from process-wide cache
         self.__channel_arrays = {0: None, 1: None, 2: None}
         self.__lsb_inverted = None
+        self.__bit_planes = dict()  # Cache of bit planes by (channel, bit) keys
 
+    # Opens image lazily: only file header is read here, pixels are decoded when array is requested first time.
+    # In tiled mode Pillow decompression bomb check is not done on opening (whole image isn't decoded), pixels
+    # limit is checked explicitly before decoding of whole image.
+    # Image can be given by path, by encoded image bytes or by binary file-like object: it is read into memory
+    # from its current position to the end, then position is restored if object is seekable (else it stays drained)
     def load(self, path):
-        self.__path = path
-        self.__image = Image.open(path)
+        if hasattr(path, "read"):
+            path = self.__read_file_object(path)
+
+        if isinstance(path, (bytes, bytearray, memoryview)):
+            self.__path = None
+            self.__data = path
+            self.__hash = hashlib.blake2b(path, digest_size=16).hexdigest()
+        else:
+            self.__path = path
+            self.__data = None
+            self.__hash = None  # Hash of file content is calculated when it is needed first time
+        self.__set_image(self.__open_image(check_pixels=not self.__tiled))
+        self.__release_source()
         self.__lsb_inverted = None
+        self.__bit_planes = dict()
         self.__channel_arrays = {0: None, 1: None, 2: None}
         self.__array = None
+        self.__shared = False
+        self.__detached = False
 
         return self
 
-    def __create_array(self, dtype=np.int32):
+    # Replaces Pillow image of handler: file of previous image is closed, file of new one is closed with handler
+    def __set_image(self, image):
+        if self.__image_closer is not None:
+            self.__image_closer()
+
+        self.__image = image
+        self.__image_closer = weakref.finalize(self, image.close) if image is not None else None
+
+    # Reads content of binary file-like object and restores its position (if object supports it)
+    def __read_file_object(self, file):
+        try:
+            position = file.tell() if file.seekable() else None
+        except (AttributeError, OSError):
+            position = None
+
+        content = file.read()
+        if position is not None:
+            file.seek(position)
+
+        return content
+
+    # Opens image file (or image bytes). Pillow decompression bomb check can be skipped (only header is read):
+    # images over Pillow limit are opened by format plugins directly, Pillow global settings aren't changed
+    def __open_image(self, check_pixels=True):
+        source = self.__path if self.__data is None else io.BytesIO(self.__data)
+        if check_pixels:
+            return Image.open(source)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+            try:
+                return Image.open(source)
+            except Image.DecompressionBombError:
+                return _open_image_header(self.__path if self.__data is None else io.BytesIO(self.__data))
+
+    # Checks that whole image can be decoded in memory: pixels number must not exceed limit of Pillow
+    # decompression bomb error (2 * Image.MAX_IMAGE_PIXELS, there is no limit if it is None)
+    def __check_pixels_limit(self):
+        width, height = self.get_size()
+        max_pixels = Image.MAX_IMAGE_PIXELS
+        if max_pixels is not None and width * height > 2 * max_pixels:
+            raise ValueError("Image is too large to be decoded in memory ({0} pixels, limit is {1}): save it in "
+                             "uncompressed format (BMP, PPM or TIFF) to read it by strips in tiled mode or "
+                             "increase PIL.Image.MAX_IMAGE_PIXELS".format(width * height, 2 * max_pixels))
+
+    def __create_array(self):
         if self.__image is None:
             return None
 
+        if self.__tiled:  # Pillow decompression bomb check was skipped on opening
+            self.__check_pixels_limit()
+
         try:
-            arr = np.asarray(self.__image)
-            old_sizes = arr.shape
+            derivation = ("array", np.dtype(self.__dtype).str)
+            with warnings.catch_warnings():
+                if self.__tiled:  # Pixels limit is checked above
+                    warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+                self.__array = self.get_cached(derivation, lambda: self.__image_to_array(self.__image))
+            self.__shared = not self.__array.flags.writeable
         except Exception as ex:
             # AppLog().write_with_error(ex, prefix=self.__errors_prefix,
             #                           data="Возникла ошибка при создании массива пикселей для {0}".format(self.__path))
             return None
 
-        new_sizes = (old_sizes[0], old_sizes[1], 3)
-        new_arr = np.zeros(shape=new_sizes, dtype=dtype)
+    # Converts Pillow image to RGB pixels array
+    def __image_to_array(self, image):
+        if image.mode not in ("RGB", "RGBA"):  # L, P and other modes are converted to RGB by Pillow
+            image = image.convert("RGB")
+        arr = np.asarray(image)
 
-        for i in range(len(arr)):
-            for j in range(len(arr[i])):
-                new_arr[i][j] = arr[i][j][:3]
+        # Dropping alpha channel and converting to needed type in one copy
+        return arr[:, :, :3].astype(self.__dtype)
 
-        self.__array = new_arr
-
-    def get_array(self):
+    # Returns pixels array of image: it is private for handler and writable. Decoded pixels are shared by handlers
+    # of the same image content (read-only array in process-wide cache), so shared array is copied on first request.
+    # Methods that only read pixels get shared array without copying by 'read_only' flag (it must not be changed)
+    def get_array(self, read_only=False):
         if self.__array is None:
             self.__create_array()
 
+        if self.__shared and not read_only:
+            self.__set_private_array(self.__array.copy())
         return self.__array
 
+    # Replaces shared array with private one: it can be changed by user, so data derived from it is calculated again
+    # and isn't taken from process-wide cache
+    def __set_private_array(self, array):
+        self.__array = array
+        self.__shared = False
+        self.__detached = True
+        self.__lsb_inverted = None
+        self.__bit_planes = dict()
+        self.__channel_arrays = {0: None, 1: None, 2: None}
+
+    # Returns True if image is handled in tiled mode (methods don't create whole image array)
+    def is_tiled(self):
+        return self.__tiled
+
+    def set_tiled(self, tiled=True):
+        self.__tiled = tiled
+
+    # Iterates over horizontal image strips in rows order: yields index of strip first row and strip array.
+    # In tiled mode only strip rows are converted to array, otherwise strips are views of whole image array
+    def iter_strips(self, strip_height=DEFAULT_STRIP_HEIGHT, channel=None):
+        width, height = self.get_size()
+
+        for row in range(0, height, strip_height):
+            strip = self.__get_strip(row, min(row + strip_height, height))
+            yield row, strip if channel is None else strip[:, :, channel.value]
+
+    # Returns array of image rows from 'row_start' to 'row_end'. In tiled mode only these rows are read
+    def get_rows(self, row_start, row_end):
+        return self.__get_strip(row_start, row_end)
+
+    def __get_strip(self, row_start, row_end):
+        if self.__tiled and not self.__detached and \
+                (self.__source is not None or (self.__array is None and self.__image is not None)):
+            return self.__get_source().read(row_start, row_end).astype(self.__dtype, copy=False)
+
+        return self.get_array(read_only=True)[row_start:row_end]
+
+    # Returns rows source of tiled mode. Rows of uncompressed image are read directly from file, compressed image
+    # is decoded once into temporary uncompressed cache (it is removed with handler or on image change)
+    def __get_source(self, decode=True):
+        if self.__source is None:
+            self.__source = self.__get_raw_source()
+
+        if self.__source is None and decode:
+            fd, cache_path = tempfile.mkstemp(prefix="sa_core_", suffix=".npy")
+            os.close(fd)
+            self.__temp_cache = weakref.finalize(self, _remove_file, cache_path)
+            self.__source = self.__decode_to_cache(cache_path, DEFAULT_STRIP_HEIGHT)
+
+        return self.__source
+
+    # Returns rows source of uncompressed image file (or None if pixels layout isn't supported)
+    def __get_raw_source(self):
+        image = self.__image
+        if image.mode not in ("RGB", "RGBA", "L") or len(image.tile) != 1:
+            return None
+
+        codec, extents, offset, args = image.tile[0][:4]
+        width, height = image.size
+        if codec != "raw" or tuple(extents) != (0, 0, width, height):
+            return None
+
+        rawmode, stride, orientation = (args, 0, 1) if isinstance(args, str) else (tuple(args) + (0, 1))[:3]
+        if rawmode not in RAW_MODES or (rawmode == "L") != (image.mode == "L"):
+            return None
+
+        pixel_size, channels = RAW_MODES[rawmode]
+        source = self.__path if self.__data is None else self.__data
+        rows_source = _RowsSource(source, offset, (height, width, pixel_size), stride or width * pixel_size,
+                                  channels=channels, bottom_up=orientation < 0)
+
+        return rows_source if rows_source.is_complete() else None
+
+    # Decodes image and writes its array into uncompressed cache file (.npy) strip by strip, returns rows source
+    # of cache. Image is decoded by separate Pillow image, so decoded pixels are freed after conversion
+    def __decode_to_cache(self, cache_path, strip_height):
+        self.__check_pixels_limit()
+
+        width = self.get_size()[0]
+        with self.__open_image(check_pixels=False) as image, warnings.catch_warnings():
+            warnings.simplefilter("ignore", Image.DecompressionBombWarning)  # Pixels limit is checked above
+            return self.__write_cache(cache_path, strip_height,
+                                      lambda row_start, row_end: self.__image_to_array(
+                                          image.crop((0, row_start, width, row_end))))
+
+    # Writes image rows (given by 'read_rows' function of first and last row) into cache file (.npy with
+    # (height, width, 3) array) strip by strip, returns rows source of cache
+    def __write_cache(self, cache_path, strip_height, read_rows):
+        width, height = self.get_size()
+        dtype = np.dtype(self.__dtype)
+        header = {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": (height, width, 3)}
+
+        with open(cache_path, "wb") as cache:
+            np.lib.format.write_array_header_1_0(cache, header)
+            offset = cache.tell()
+            for row in range(0, height, strip_height):
+                rows = read_rows(row, min(row + strip_height, height))
+                np.ascontiguousarray(rows, dtype=dtype).tofile(cache)
+
+        return _RowsSource(cache_path, offset, (height, width, 3), width * 3 * dtype.itemsize, dtype)
+
+    # Removes temporary cache of tiled mode and forgets rows source
+    def __release_source(self):
+        self.__source = None
+        if self.__temp_cache is not None:
+            self.__temp_cache()
+            self.__temp_cache = None
+
+    # Converts image into uncompressed cache file (.npy) strip by strip and uses cache as image array.
+    # Uncompressed image is read by rows, compressed one is decoded once (decoded pixels aren't kept)
+    def create_cache(self, cache_path, strip_height=DEFAULT_STRIP_HEIGHT):
+        if self.__source is not None or (self.__array is None and self.__image is not None and
+                                         self.__get_source(decode=False) is not None):
+            self.__write_cache(cache_path, strip_height, self.__source.read)
+        elif self.__array is None and self.__image is not None:
+            self.__decode_to_cache(cache_path, strip_height)
+        else:
+            self.__write_cache(cache_path, strip_height,
+                               lambda row_start, row_end: self.get_array(read_only=True)[row_start:row_end])
+
+        return self.load_cache(cache_path)
+
+    # Uses memory-mapped uncompressed cache file (.npy with (height, width, 3) array) as image array (copy-on-write:
+    # changes of array aren't written to file). In tiled mode strips are read from cache file by rows
+    def load_cache(self, cache_path):
+        path = self.__path if self.__path is not None else cache_path
+        cache = np.load(cache_path, mmap_mode="c")
+        self.set_array(cache, path=path)
+
+        row_size = cache.shape[1] * cache.shape[2] * cache.dtype.itemsize
+        self.__source = _RowsSource(cache_path, cache.offset, cache.shape, row_size, cache.dtype)
+        return self
+
     def print_array(self):
         if self.__array is None:
             return
@@ -67,30 +309,33 @@ class ImageHandler:
                       .format(pixel[0], pixel[1], pixel[2]), end='')
             print()
 
-    def __save_to_img(self, array, name):
+    def __save_to_img(self, array, name, format=None):
         try:
-            img = Image.fromarray(array.astype(np.uint8))
-            img.save(name)
+            img = Image.fromarray(array.astype(np.uint8, copy=False))
+            img.save(name, format=format)
         except Exception as ex:
             # AppLog().write_with_error(ex, prefix=self.__errors_prefix,
             #                           data="Возникла ошибка при сохранении изображения")
             pass
 
-    def save(self, name):
-        self.__save_to_img(self.__array, name)
+    # Saves image array to file: 'name' can be path or binary file-like object (then format must be specified)
+    def save(self, name, format=None):
+        self.__save_to_img(self.get_array(read_only=True), name, format)
+
+    # Returns image array encoded in image file format (without writing to disk)
+    def get_bytes(self, format="PNG"):
+        buffer = io.BytesIO()
+        self.__save_to_img(self.get_array(read_only=True), buffer, format)
+        return buffer.getvalue()
 
-    def get_channel_array(self, channel):
+    # Returns channel array: strided view of image array (see 'get_array' about 'read_only' flag)
+    def get_channel_array(self, channel, read_only=False):
+        array = self.get_array(read_only)  # Shared array is replaced with private one here if it is needed
         if self.__channel_arrays[channel.value] is not None:
             return self.__channel_arrays[channel.value]
 
-        if self.__array is None:
-            self.__create_array()
-
-        channel_array = np.zeros(shape=(self.__array.shape[0], self.__array.shape[1]))
-
-        for i in range(len(self.__array)):
-            for j in range(len(self.__array[i])):
-                channel_array[i][j] = self.__array[i][j][channel.value]
+        # Strided view of image array (without copying)
+        channel_array = array[:, :, channel.value]
 
         self.__channel_arrays[channel.value] = channel_array
         return channel_array
@@ -99,7 +344,7 @@ class ImageHandler:
         if self.__channel_arrays[channel.value] is not None:
             channel_array = self.__channel_arrays[channel.value]
         else:
-            channel_array = self.get_channel_array(channel)
+            channel_array = self.get_channel_array(channel, read_only=True)
 
         for row in channel_array:
             for pixel in row:
@@ -116,62 +361,61 @@ class ImageHandler:
     def get_blue(self):
         return self.get_channel_array(ImgChannel.BLUE)
 
-    def set_array(self, new_array):
+    def set_array(self, new_array, path=None):
         self.__array = new_array
-        self.__image = None
-        self.__path = None
+        self.__shared = False
+        self.__detached = False
+        self.__set_image(None)
+        self.__release_source()
+        self.__path = path  # Path of image the array was taken from (it is used only as image name)
+        self.__hash = None
+        self.__data = None
         self.__lsb_inverted = None
+        self.__bit_planes = dict()
         self.__channel_arrays = {0: None, 1: None, 2: None}
 
     def save_channel(self, channel, name=""):
         if self.__channel_arrays[channel.value] is not None:
             channel_array = self.__channel_arrays[channel.value]
         else:
-            channel_array = self.get_channel_array(channel)
+            channel_array = self.get_channel_array(channel, read_only=True)
 
-        height = channel_array.shape[0]
-        width = channel_array.shape[1]
-        deep = 3
-
-        np_c = np.zeros(shape=(height, width, deep))
-        for i in range(height):
-            for j in range(width):
-                for k in range(deep):
-                    if k != channel.value:
-                        np_c[i][j][k] = 0
-                    else:
-                        np_c[i][j][k] = channel_array[i][j]
+        np_c = np.zeros(shape=(*channel_array.shape, 3))
+        np_c[:, :, channel.value] = channel_array
 
         name = name + "_" + channel.name + ".png"
         self.__save_to_img(np_c, name)
 
-    def __invert(self, num):
-        byte_str = bin(num)
-
-        new_byte_str = byte_str[:-1]
-        if byte_str[-1] == '1':
-            new_byte_str += str(0)
-        else:
-            new_byte_str += str(1)
-
-        return int(new_byte_str, 2)
-
-    def invert_lsb(self):
-        if self.__lsb_inverted is not None:
-            return self.__lsb_inverted
-
-        new_arr = np.zeros(self.__array.shape, dtype=self.__array.dtype)
-        for i in range(new_arr.shape[0]):
-            for j in range(new_arr.shape[1]):
-                for k in range(new_arr.shape[2]):
-                    new_arr[i][j][k] = self.__invert(self.__array[i][j][k])
-
-        self.__lsb_inverted = new_arr
-        return new_arr
-
+    # Returns image array with inverted least significant bits (see 'get_array' about 'read_only' flag)
+    def invert_lsb(self, read_only=False):
+        if self.__lsb_inverted is None:
+            # Flipping of least significant bits of all pixels values in one operation
+            array = self.get_array(read_only=True)
+            self.__lsb_inverted = self.get_cached(("lsb_inverted", array.dtype.str),
+                                                  lambda: array ^ array.dtype.type(1))
+
+        if not read_only and not self.__lsb_inverted.flags.writeable:
+            self.__lsb_inverted = self.__lsb_inverted.copy()
+        return self.__lsb_inverted
+
+    # Returns array of bit values (0 or 1) at 'bit' position for channel (it is read-only array shared by handlers
+    # of the same image content)
+    def get_bit_plane(self, channel, bit=0):
+        key = (channel.value, bit)
+        if key in self.__bit_planes:
+            return self.__bit_planes[key]
+
+        channel_array = self.get_channel_array(channel, read_only=True)
+        bit_plane = self.get_cached(("bit_plane", channel_array.dtype.str, channel.value, bit),
+                                    lambda: ((channel_array >> bit) & 1).astype(np.uint8))
+
+        self.__bit_planes[key] = bit_plane
+        return bit_plane
+
+    # Returns image width and height (from file header if pixels are not decoded yet)
     def get_size(self):
         if self.__image is not None:
-            img_size = np.asarray(self.__image).shape
+            return self.__image.size
         elif self.__array is not None:
             img_size = self.__array.shape
         else:
@@ -179,5 +423,148 @@ class ImageHandler:
 
         return img_size[1], img_size[0]
 
+    # Returns image mode from file header (like 'RGB', 'RGBA', 'L' or 'P')
+    def get_mode(self):
+        if self.__image is not None:
+            return self.__image.mode
+        return None
+
+    # Returns image file format from file header (like 'PNG' or 'BMP')
+    def get_format(self):
+        if self.__image is not None:
+            return self.__image.format
+        return None
+
+    # Returns number of frames in image file (it is 1 for not animated images)
+    def get_frames_count(self):
+        if self.__image is not None:
+            return getattr(self.__image, "n_frames", 1)
+        elif self.__array is not None:
+            return 1
+        return 0
+
+    def get_dtype(self):
+        return self.__dtype
+
     def get_path(self):
         return self.__path
+
+    # Returns hash of image file content (None if image was not loaded from file or from image bytes)
+    def get_hash(self):
+        if self.__hash is None and self.__image is not None and self.__path is not None:
+            file_hash = hashlib.blake2b(digest_size=16)
+            with open(self.__path, 'rb') as file:
+                for chunk in iter(lambda: file.read(1024 * 1024), b''):
+                    file_hash.update(chunk)
+            self.__hash = file_hash.hexdigest()
+
+        return self.__hash
+
+    # Returns data derived from image content (derivation is a tuple that describes data, like ("array", dtype)).
+    # Data is taken from process-wide cache shared by all handlers of the same image content, or is created
+    # by 'factory' function and cached. Data of images without file content hash (or with private array which
+    # can be changed) is not cached
+    def get_cached(self, derivation, factory):
+        content_hash = None if self.__detached else self.get_hash()
+        if content_hash is None:
+            return factory()
+
+        return get_data_cache().get_or_create((content_hash, *derivation), factory)
+
+
+# Source of rows of uncompressed pixels data stored by rows ('stride' bytes each, from 'offset') in file or in bytes.
+# Only requested rows are read, they are returned as (rows, width, 3) array of red, green and blue values
+class _RowsSource:
+    def __init__(self, source, offset, shape, stride, dtype=np.uint8, channels=(0, 1, 2), bottom_up=False):
+        self.source = source  # File path or bytes
+        self.offset = offset
+        self.shape = tuple(shape)  # (height, width, values per pixel)
+        self.stride = stride
+        self.dtype = np.dtype(dtype)
+        self.channels = list(channels)  # Indexes of red, green and blue values in pixel
+        self.bottom_up = bottom_up  # Rows are stored from bottom to top
+
+    # Returns True if source contains all rows
+    def is_complete(self):
+        try:
+            size = os.path.getsize(self.source) if isinstance(self.source, (str, os.PathLike)) else len(self.source)
+        except OSError:
+            return False
+
+        return size >= self.offset + self.shape[0] * self.stride
+
+    def read(self, row_start, row_end):
+        height, width, pixel_size = self.shape
+        rows_num = row_end - row_start
+        first_row = height - row_end if self.bottom_up else row_start
+
+        offset = self.offset + first_row * self.stride
+        if isinstance(self.source, (str, os.PathLike)):
+            data = np.fromfile(self.source, dtype=np.uint8, count=rows_num * self.stride, offset=offset)
+        else:
+            data = np.frombuffer(self.source, dtype=np.uint8, count=rows_num * self.stride, offset=offset)
+
+        row_size = width * pixel_size * self.dtype.itemsize
+        rows = data.reshape(rows_num, self.stride)[:, :row_size].view(self.dtype).reshape(rows_num, width, pixel_size)
+        if self.bottom_up:
+            rows = rows[::-1]
+
+        return rows[:, :, self.channels]
+
+
+# Opens image (header only) by Pillow format plugins without decompression bomb check of Image.open.
+# Image file given by path is opened and closed by Pillow image itself
+def _open_image_header(source):
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as file:
+            prefix = file.read(16)
+        filename = os.fspath(source)
+    else:
+        prefix = source.read(16)
+        filename = ""
+
+    Image.init()
+    for format_id in Image.ID:
+        factory, accept = Image.OPEN[format_id]
+        accepted = accept is None or accept(prefix)
+        if isinstance(accepted, str) or not accepted:  # String is warning of format plugin (format isn't accepted)
+            continue
+
+        try:
+            if not filename:
+                source.seek(0)
+            return factory(filename or source, filename)
+        except (SyntaxError, IndexError, TypeError, struct.error):  # Format plugin doesn't accept image
+            continue
+
+    raise Image.UnidentifiedImageError("Cannot identify image file {0}".format(filename or repr(source)))
+
+
+# Removes file if it exists (temporary files of image handlers)
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# Returns ImageHandler for any supported image source:
+# ImageHandler instance, image path, encoded image bytes, binary file-like object or pixels array
+def to_image_handler(img):
+    if isinstance(img, ImageHandler):
+        return img
+
+    handler = ImageHandler()
+    if isinstance(img, np.ndarray):
+        if img.ndim == 2:  # Grayscale pixels array is represented as RGB array
+            img = np.repeat(img[:, :, np.newaxis], 3, axis=2)
+        elif img.ndim != 3 or img.shape[2] < 3:
+            raise ValueError("Pixels array must have (height, width) or (height, width, 3 or 4) shape")
+        handler.set_array(img[:, :, :3])
+    elif isinstance(img, (str, os.PathLike, bytes, bytearray, memoryview)) or hasattr(img, "read"):
+        handler.load(img)
+    else:
+        raise ValueError("'img' must be ImageHandler instance, image path, image bytes, file-like object "
+                         "or pixels array")
+
+    return handler
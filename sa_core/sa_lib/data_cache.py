@@ -0,0 +1,102 @@
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_MAX_SIZE = 512 * 1024 * 1024  # Default limit of cached data size (in bytes)
+
+
+# Cache of data with limited size and LRU (least recently used) eviction.
+# Cached arrays are made read-only because they are shared between all cache users
+class DataCache:
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        self.__max_size = max_size
+        self.__size = 0
+        self.__items = OrderedDict()  # Values and they sizes by keys, in order from least to most recently used
+        self.__lock = threading.RLock()
+
+    # Returns cached value by key or default value if there is no such key
+    def get(self, key, default=None):
+        with self.__lock:
+            if key not in self.__items:
+                return default
+
+            self.__items.move_to_end(key)
+            return self.__items[key][0]
+
+    # Saves value to cache (values larger than cache size limit are not saved)
+    def put(self, key, value):
+        size = self.__get_data_size(value)
+
+        with self.__lock:
+            self.remove(key)
+            if size > self.__max_size:
+                return
+
+            self.__set_read_only(value)
+            self.__items[key] = (value, size)
+            self.__size += size
+            self.__evict()
+
+    # Returns cached value by key: value is created by 'factory' function and saved to cache if it is not cached yet
+    def get_or_create(self, key, factory):
+        value = self.get(key, None)
+        if value is None:
+            value = factory()
+            self.put(key, value)
+
+        return value
+
+    # Removes value from cache
+    def remove(self, key):
+        with self.__lock:
+            if key in self.__items:
+                self.__size -= self.__items.pop(key)[1]
+
+    # Removes all values from cache
+    def clear(self):
+        with self.__lock:
+            self.__items.clear()
+            self.__size = 0
+
+    # Returns size of all cached data (in bytes)
+    def get_size(self):
+        return self.__size
+
+    def get_max_size(self):
+        return self.__max_size
+
+    # Sets cache size limit (in bytes): 0 disables caching
+    def set_max_size(self, max_size):
+        with self.__lock:
+            self.__max_size = max_size
+            self.__evict()
+
+    # Removes least recently used values while cache size exceeds the limit
+    def __evict(self):
+        while self.__size > self.__max_size and len(self.__items) > 0:
+            key, (value, size) = self.__items.popitem(last=False)
+            self.__size -= size
+
+    def __get_data_size(self, value):
+        if isinstance(value, np.ndarray):
+            return value.nbytes
+        if isinstance(value, (list, tuple)):
+            return sum(self.__get_data_size(e) for e in value)
+        return sys.getsizeof(value)
+
+    def __set_read_only(self, value):
+        if isinstance(value, np.ndarray):
+            value.setflags(write=False)
+        elif isinstance(value, (list, tuple)):
+            for e in value:
+                self.__set_read_only(e)
+
+
+_data_cache = DataCache()
+
+
+# Returns process-wide data cache
+def get_data_cache():
+    return _data_cache
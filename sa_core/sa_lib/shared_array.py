@@ -0,0 +1,52 @@
+import numpy as np
+from multiprocessing import shared_memory
+
+
+# Numpy array placed into shared memory block: other processes get access to it by meta-data without pickling
+class SharedArray:
+    def __init__(self):
+        self.__shm = None
+        self.__array = None
+        self.__meta = None
+
+    # Creates new shared memory block and copies array into it
+    def create(self, array):
+        self.__shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self.__array = np.ndarray(array.shape, dtype=array.dtype, buffer=self.__shm.buf)
+        self.__array[...] = array
+        self.__meta = (self.__shm.name, array.shape, array.dtype.str)
+
+        return self
+
+    # Attaches to existing shared memory block by its meta-data (as zero-copy array view)
+    def attach(self, meta):
+        name, shape, dtype = meta
+        self.__shm = shared_memory.SharedMemory(name=name)
+        self.__array = np.ndarray(shape, dtype=dtype, buffer=self.__shm.buf)
+        self.__meta = meta
+
+        return self
+
+    # Returns array view of shared memory block (it is valid only while this instance is alive and not closed)
+    def get_array(self):
+        return self.__array
+
+    # Returns picklable meta-data (block name, shape and dtype) that is needed for attaching
+    def get_meta(self):
+        return self.__meta
+
+    # Closes access to shared memory block in current process (all array views must be released before)
+    def close(self):
+        if self.__shm is None:
+            return
+
+        self.__array = None
+        self.__shm.close()
+
+    # Closes access and destroys shared memory block
+    def unlink(self):
+        if self.__shm is None:
+            return
+
+        self.__shm.unlink()
+        self.close()
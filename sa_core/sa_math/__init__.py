@@ -1,9 +1,13 @@
 # This subpackage contains different mathematical methods that are needed for steganography and steganalysis methods
 
 # Chi square imports
-from .chi_sqr import ChiSqrMethod, chi_sqr
+from .chi_sqr import ChiSqrMethod, chi_sqr, chi_sqr_batch
+from .chi_sqr_categories import unify_categories
 
 # DCT imports
-from .dct import DctMethod, dct, idct
+from .dct import DctMethod, dct, idct, dct_blocks, idct_blocks, get_blocks_view
+from .dct_backends import DctBackend, register_dct_backend, get_dct_backends, tune_dct_backend
 
-__all__ = ['ChiSqrMethod', 'chi_sqr', 'DctMethod', 'dct', 'idct']
+__all__ = ['ChiSqrMethod', 'chi_sqr', 'chi_sqr_batch', 'unify_categories', 'DctMethod', 'dct', 'idct',
+           'dct_blocks', 'idct_blocks', 'get_blocks_view', 'DctBackend', 'register_dct_backend', 'get_dct_backends',
+           'tune_dct_backend']
@@ -19,3 +19,9 @@ def chi_sqr(observed, expected, method=ChiSqrMethod.APACHE):
         raise ValueError("Observed and expected values arrays must be the same length")
 
     return methods[method.value](observed, expected)
+
+
+# Calculate ChiSquare tests for all rows of observed and expected matrices at once (vectorized).
+# Rows with less categories are padded by zero expected (and observed) values. Returns arrays of chi^2 and p values
+def chi_sqr_batch(observed_matrix, expected_matrix, dof_vector=None):
+    return chi_sqr_batch_vectorized(observed_matrix, expected_matrix, dof_vector)
@@ -0,0 +1,79 @@
+import numpy as np
+
+
+# Unifies categories with low expected values (<= unify_const) for all rows of observed and expected matrices.
+# Low categories are summed in adjacent pairs until sums exceed unify_const, the last non-pair category is added
+# to category with minimum expected value. Categories with zero expected values are padding.
+# Returns observed and expected matrices of unified categories (padded by zero values) and categories numbers
+def unify_categories(observed_matrix, expected_matrix, unify_const):
+    observed_matrix = np.atleast_2d(np.asarray(observed_matrix, dtype=np.float64))
+    expected_matrix = np.atleast_2d(np.asarray(expected_matrix, dtype=np.float64))
+    if observed_matrix.shape != expected_matrix.shape:
+        raise ValueError("Observed and expected matrices must be the same shape")
+
+    rows_num, width = expected_matrix.shape
+    categories = expected_matrix > 0
+
+    # 'Normal' categories are placed first (in source order), categories that needs to be unifying are put aside
+    new_observed = np.zeros_like(observed_matrix)
+    new_expected = np.zeros_like(expected_matrix)
+    new_lens = np.zeros(rows_num, dtype=np.intp)
+    new_lens = _append_categories(new_observed, new_expected, new_lens, observed_matrix, expected_matrix,
+                                  categories & (expected_matrix > unify_const))
+
+    touni_observed, touni_expected, touni_lens = _compact_categories(observed_matrix, expected_matrix,
+                                                                     categories & (expected_matrix <= unify_const))
+
+    # Unifying operation
+    while np.any(touni_lens > 0):
+        # Unifying adjacent categories (padding zeros keeps last non-pair category as is)
+        if touni_expected.shape[1] % 2 == 1:
+            touni_observed = np.pad(touni_observed, ((0, 0), (0, 1)))
+            touni_expected = np.pad(touni_expected, ((0, 0), (0, 1)))
+        touni_observed = touni_observed[:, 0::2] + touni_observed[:, 1::2]
+        touni_expected = touni_expected[:, 0::2] + touni_expected[:, 1::2]
+        touni_lens = (touni_lens + 1) // 2
+        valid = np.arange(touni_expected.shape[1]) < touni_lens[:, np.newaxis]
+
+        # Moves big enough categories to all categories
+        to_move = valid & (touni_expected > unify_const)
+        new_lens = _append_categories(new_observed, new_expected, new_lens, touni_observed, touni_expected, to_move)
+        touni_observed, touni_expected, touni_lens = _compact_categories(touni_observed, touni_expected,
+                                                                         valid & ~to_move)
+
+        # Appending last non-pair category to category with minimum value
+        last = np.flatnonzero(touni_lens == 1)
+        if len(last) > 0:
+            if np.any(new_lens[last] == 0):
+                raise ValueError("Categories can't be unified: there are no categories with enough expected values")
+
+            masked_expected = np.where(np.arange(width) < new_lens[last, np.newaxis], new_expected[last], np.inf)
+            ind = np.argmin(masked_expected, axis=1)
+            new_expected[last, ind] += touni_expected[last, 0]
+            new_observed[last, ind] += touni_observed[last, 0]
+            touni_lens[last] = 0
+
+    # Cutting unused padding
+    max_len = new_lens.max(initial=0)
+    return new_observed[:, :max_len], new_expected[:, :max_len], new_lens
+
+
+# Appends masked categories to the ends of rows of categories matrices (in their order). Returns new rows lengths
+def _append_categories(observed_matrix, expected_matrix, lens, observed, expected, mask):
+    row_inds, col_inds = np.nonzero(mask)
+    positions = lens[row_inds] + (np.cumsum(mask, axis=1)[row_inds, col_inds] - 1)
+
+    observed_matrix[row_inds, positions] = observed[row_inds, col_inds]
+    expected_matrix[row_inds, positions] = expected[row_inds, col_inds]
+    return lens + np.count_nonzero(mask, axis=1)
+
+
+# Moves masked categories to the starts of rows (in their order), other values are zeroed.
+# Returns new categories matrices and rows lengths
+def _compact_categories(observed, expected, mask):
+    lens = np.count_nonzero(mask, axis=1)
+    compact_observed = np.zeros(shape=(len(observed), lens.max(initial=0)))
+    compact_expected = np.zeros(shape=(len(expected), lens.max(initial=0)))
+
+    _append_categories(compact_observed, compact_expected, np.zeros_like(lens), observed, expected, mask)
+    return compact_observed, compact_expected, lens
@@ -3,5 +3,6 @@
 from .chi_sqr_scipy import chi_sqr as chi_sqr_scipy
 from .chi_sqr_manual import chi_sqr as chi_sqr_manual
 from .chi_sqr_apache import chi_sqr as chi_sqr_apache
+from .chi_sqr_batch import chi_sqr as chi_sqr_batch_vectorized
 
-__all__ = ['chi_sqr_scipy', 'chi_sqr_manual', 'chi_sqr_apache']
+__all__ = ['chi_sqr_scipy', 'chi_sqr_manual', 'chi_sqr_apache', 'chi_sqr_batch_vectorized']
@@ -95,8 +95,7 @@ def _continuedFraction(x, epsilon, maxIterations, getA, getB):
             scale = max(a, b)
 
             if scale <= 0:
-                print("Can't scale")
-                sys.exit()
+                raise ArithmeticError("Can't scale continued fraction: non-positive scale")
 
             infinite = True
             for i in range(maxPower):
@@ -113,14 +112,12 @@ def _continuedFraction(x, epsilon, maxIterations, getA, getB):
                     break
 
         if infinite:
-            print("Can't scale")
-            sys.exit()
+            raise ArithmeticError("Can't scale continued fraction: infinite value")
 
         r = p2 / q2
 
         if r is None:
-            print("NaN divergence")
-            sys.exit()
+            raise ArithmeticError("Continued fraction NaN divergence")
 
         relativeError = math.fabs(r / c - 1.0)
 
@@ -131,8 +128,7 @@ def _continuedFraction(x, epsilon, maxIterations, getA, getB):
         q1 = q2
 
     if n >= maxIterations:
-        print("Non convergent")
-        sys.exit()
+        raise ArithmeticError("Continued fraction is non convergent")
 
     return c
 
@@ -147,26 +143,22 @@ def cumulativeProbability(x, degreesOfFreedom):
 def checkPositive(arr):
     for i in range(len(arr)):
         if arr[i] <= 0:
-            print("NOT_POSITIVE_ELEMENT_AT_INDEX " + str(i))
-            sys.exit()
+            raise ValueError("Not positive element at index " + str(i))
 
 
 def checkNonNegative(arr):
     for i in range(len(arr)):
         if arr[i] < 0:
-            print("NEGATIVE_ELEMENT_AT_INDEX " + str(i))
-            sys.exit()
+            raise ValueError("Negative element at index " + str(i))
 
 
 def chiSquare(expected, observed):
 
     if len(expected) < 2:
-        print("Dimension mismatch")
-        sys.exit()
+        raise ValueError("Dimension mismatch: at least 2 categories are needed")
 
     if len(expected) != len(observed):
-        print("Dimension not equal")
-        sys.exit()
+        raise ValueError("Dimension not equal")
 
     checkPositive(expected)
     checkNonNegative(observed)
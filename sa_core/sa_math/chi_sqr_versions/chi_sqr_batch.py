@@ -0,0 +1,48 @@
+# Vectorized ChiSquare test for many tests at once (results are consistent with Apache port variant)
+
+import numpy as np
+import scipy.special
+
+RESCALE_EPSILON = 10E-6  # Sums of observed and expected values differing more than it leads to expected rescaling
+
+
+# Calculates ChiSquare tests for all rows of observed and expected matrices.
+# Categories with zero expected values are padding (so rows can have different categories number)
+def chi_sqr(observed_matrix, expected_matrix, dof_vector=None):
+    observed_matrix = np.atleast_2d(np.asarray(observed_matrix, dtype=np.float64))
+    expected_matrix = np.atleast_2d(np.asarray(expected_matrix, dtype=np.float64))
+
+    if observed_matrix.shape != expected_matrix.shape:
+        raise ValueError("Observed and expected matrices must be the same shape")
+    if np.any(expected_matrix < 0):
+        raise ValueError("Expected values must be positive")
+    if np.any(observed_matrix < 0):
+        raise ValueError("Observed values must be non-negative")
+
+    categories = expected_matrix > 0
+    if np.any(observed_matrix[~categories] > 0):
+        raise ValueError("Observed values of padding categories (with zero expected values) must be zero")
+
+    if dof_vector is None:
+        dof_vector = np.count_nonzero(categories, axis=1) - 1
+    dof_vector = np.broadcast_to(np.asarray(dof_vector), (len(expected_matrix),))
+    if np.any(dof_vector < 1):
+        raise ValueError("Dimension mismatch: at least 2 categories are needed for every test")
+
+    # Rescaling of expected values to observed values sum
+    sum_observed = observed_matrix.sum(axis=1)
+    sum_expected = expected_matrix.sum(axis=1)
+    ratio = np.where(np.abs(sum_expected - sum_observed) > RESCALE_EPSILON, sum_observed / sum_expected, 1.0)
+    expected_matrix = expected_matrix * ratio[:, np.newaxis]
+
+    # ChiSquare values (padding categories gives zero terms)
+    dev = observed_matrix - expected_matrix
+    terms = np.divide(dev * dev, expected_matrix, out=np.zeros_like(dev), where=categories)
+    chi2 = terms.sum(axis=1)
+
+    # P-values: 1 - CDF of ChiSquare distribution, it is regularized upper incomplete gamma function
+    p = scipy.special.gammaincc(dof_vector / 2, np.maximum(chi2, 0) / 2)
+    if not np.all(np.isfinite(p)):
+        raise ArithmeticError("ChiSquare p-values calculation diverged")
+
+    return chi2, p
@@ -1,25 +1,38 @@
-from enum import Enum
+import numpy as np
 
-from .dct_versions import *
+from .dct_backends import DctMethod, METHOD_AXES, REFERENCE_BACKENDS, get_dct_backend
 
 
-# DCT variants of realisation
-class DctMethod(Enum):
-    SCIPY = 0
-    MANUAL = 1
+# Calculate DCT (by reference backend of DCT variant if backend is not set)
+def dct(array, method=DctMethod.SCIPY, backend=None):
+    array = np.asarray(array)
+    backend = get_dct_backend(method, array.shape[-1], REFERENCE_BACKENDS[method] if backend is None else backend)
+    return backend.dct(array, METHOD_AXES[method])
 
 
-# Calculate DCT
-def dct(array, method=DctMethod.SCIPY):
-    if method == DctMethod.SCIPY:
-        return dct_scipy(array)
-    elif method == DctMethod.MANUAL:
-        return dct_manual(array)
+# Calculate Inverse DCT (by reference backend of DCT variant if backend is not set)
+def idct(array, method=DctMethod.SCIPY, backend=None):
+    array = np.asarray(array)
+    backend = get_dct_backend(method, array.shape[-1], REFERENCE_BACKENDS[method] if backend is None else backend)
+    return backend.idct(array, METHOD_AXES[method])
 
 
-# Calculate Inverse DCT
-def idct(array, method=DctMethod.SCIPY):
-    if method == DctMethod.SCIPY:
-        return idct_scipy(array)
-    elif method == DctMethod.MANUAL:
-        return idct_manual(array)
+# Returns blocks grid of 2-D array - (blocks rows, blocks columns, block size, block size) view of array
+# (without copying, so writing to it changes array). Rows and columns that don't form whole blocks are skipped
+def get_blocks_view(array, block_size):
+    rows, cols = array.shape[0] // block_size, array.shape[1] // block_size
+    view = array[:rows * block_size, :cols * block_size].reshape(rows, block_size, cols, block_size)
+    return view.transpose(0, 2, 1, 3)
+
+
+# Calculate DCT of all blocks of array of blocks (..., block size, block size) at once.
+# Backend can be set by name (otherwise reference backend of DCT variant is used, see AUTO_TUNING)
+def dct_blocks(blocks, method=DctMethod.SCIPY, backend=None):
+    blocks = np.asarray(blocks)
+    return get_dct_backend(method, blocks.shape[-1], backend).dct(blocks, METHOD_AXES[method])
+
+
+# Calculate Inverse DCT of all blocks of array of blocks (..., block size, block size) at once
+def idct_blocks(blocks, method=DctMethod.SCIPY, backend=None):
+    blocks = np.asarray(blocks)
+    return get_dct_backend(method, blocks.shape[-1], backend).idct(blocks, METHOD_AXES[method])
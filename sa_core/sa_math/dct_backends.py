@@ -0,0 +1,187 @@
+import json
+import os
+import platform
+import threading
+import time
+from enum import Enum
+from functools import partial
+
+import numpy as np
+import scipy
+
+from .dct_versions import *
+
+# Blocks DCT backends that aren't set are chosen by benchmark (off by default: reference backends are used).
+# Tuning runs benchmark on first use and writes its result to cache file, so it is enabled only explicitly
+AUTO_TUNING = os.environ.get("SA_CORE_DCT_AUTO_TUNING", "").lower() in ("1", "true", "yes")
+AUTO_BACKEND = "auto"  # Name that selects backend chosen by benchmark (explicit opt-in for one call)
+TUNING_BLOCKS = 4096  # Number of random blocks transformed by each backend in benchmark
+TUNING_REPEATS = 5  # Number of benchmark repeats (the best time of backend is used)
+TUNING_CACHE_PATH = os.environ.get("SA_CORE_DCT_CACHE",
+                                   os.path.join(os.path.expanduser("~"), ".cache", "sa_core", "dct_backends.json"))
+
+
+# DCT variants of realisation (transforms of blocks)
+class DctMethod(Enum):
+    SCIPY = 0  # 1-D DCT of blocks rows (DCT along last axis of block)
+    MANUAL = 1  # 2-D DCT of blocks
+
+
+# Blocks axes that are transformed by DCT variants
+METHOD_AXES = {DctMethod.SCIPY: (-1,), DctMethod.MANUAL: (-2, -1)}
+
+# Reference backends of DCT variants: they are used for single arrays and by default for blocks
+REFERENCE_BACKENDS = {DctMethod.SCIPY: "fftpack", DctMethod.MANUAL: "numpy_matrix"}
+
+
+# DCT backend struct. Functions of DCT and inverse DCT take array of blocks (..., N, N) and transformed axes.
+# Only exact (float64) backends are chosen by tuning, inexact ones (e.g. float32) can be chosen explicitly
+class DctBackend:
+    name = None
+    dct = None
+    idct = None
+    exact = None
+
+    def __init__(self, name, dct, idct, exact=True):
+        self.name = name
+        self.dct = dct
+        self.idct = idct
+        self.exact = exact
+
+
+_backends = dict()  # Registered backends by names
+_tuned = dict()  # Names of tuned backends by DCT variant and block size
+_tuning_lock = threading.Lock()
+
+
+# Registers DCT backend (backend with the same name is replaced)
+def register_dct_backend(name, dct, idct, exact=True):
+    _backends[name] = DctBackend(name, dct, idct, exact)
+
+
+# Returns all registered backends by names
+def get_dct_backends():
+    return dict(_backends)
+
+
+# Returns DCT backend by its name (or backend itself). If name is not set reference backend of DCT variant is used
+# (or backend chosen by benchmark if tuning is enabled), 'auto' name selects backend chosen by benchmark
+def get_dct_backend(method, block_size, backend=None):
+    if isinstance(backend, DctBackend):
+        return backend
+
+    if backend is None:
+        backend = AUTO_BACKEND if AUTO_TUNING else REFERENCE_BACKENDS[method]
+    if backend == AUTO_BACKEND:
+        backend = tune_dct_backend(method, block_size)
+
+    if backend not in _backends:
+        raise ValueError("Unknown DCT backend: {0}".format(backend))
+    return _backends[backend]
+
+
+# Returns name of the fastest exact backend of DCT variant for this host and block size. Choice is made by
+# micro-benchmark once and saved to cache file (it is reused by all processes while host is the same)
+def tune_dct_backend(method, block_size, force=False):
+    key = "{0}:{1}".format(method.name, block_size)
+
+    with _tuning_lock:
+        if not force:
+            if key in _tuned:
+                return _tuned[key]
+
+            name = _load_tuning().get(key)
+            if name in _backends:
+                _tuned[key] = name
+                return name
+
+        name = _benchmark(method, block_size)
+        _tuned[key] = name
+        _save_tuning(key, name)
+        return name
+
+
+# Measures DCT and inverse DCT time of all exact backends and returns name of the fastest one. Backends must give
+# bit-identical results with reference backend: even rounding errors of zero coefficients of flat blocks change
+# Koch-Zhao hiding results
+def _benchmark(method, block_size):
+    axes = METHOD_AXES[method]
+    rng = np.random.default_rng(0)
+    blocks = rng.integers(0, 256, size=(TUNING_BLOCKS, block_size, block_size)).astype(np.float64)
+    blocks[::2, ::2] = blocks[::2, :1, :1]  # Flat rows
+
+    reference = _backends[REFERENCE_BACKENDS[method]]
+    expected = reference.dct(blocks, axes)
+    expected_inverse = reference.idct(expected, axes)
+
+    best_name, best_time = reference.name, None
+    for backend in _backends.values():
+        if not backend.exact:
+            continue
+
+        try:
+            if not (np.array_equal(backend.dct(blocks, axes), expected) and
+                    np.array_equal(backend.idct(expected, axes), expected_inverse)):
+                continue
+
+            backend_time = min(_get_time(backend, blocks, axes) for i in range(TUNING_REPEATS))
+        except ValueError:  # Backend doesn't support this variant
+            continue
+
+        if best_time is None or backend_time < best_time:
+            best_name, best_time = backend.name, backend_time
+
+    return best_name
+
+
+# Returns time of DCT and inverse DCT of blocks by backend
+def _get_time(backend, blocks, axes):
+    start = time.perf_counter()
+    backend.idct(backend.dct(blocks, axes), axes)
+    return time.perf_counter() - start
+
+
+# Returns identifier of host (tuning results are valid only for the same hardware and libraries)
+def _get_host_id():
+    return "|".join([platform.node(), platform.machine(), platform.processor(), str(os.cpu_count()),
+                     np.__version__, scipy.__version__])
+
+
+# Returns saved names of tuned backends for this host (empty if there are no valid saved results)
+def _load_tuning():
+    try:
+        with open(TUNING_CACHE_PATH, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return dict()
+
+    if not isinstance(data, dict) or data.get("host") != _get_host_id():
+        return dict()
+    return data.get("backends", dict())
+
+
+# Saves name of tuned backend to cache file (it is replaced atomically). Tuning result is kept in memory
+# only if cache file can't be written
+def _save_tuning(key, name):
+    backends = _load_tuning()
+    backends[key] = name
+
+    try:
+        os.makedirs(os.path.dirname(TUNING_CACHE_PATH), exist_ok=True)
+        tmp_path = "{0}.{1}.tmp".format(TUNING_CACHE_PATH, os.getpid())
+        with open(tmp_path, "w") as f:
+            json.dump({"host": _get_host_id(), "backends": backends}, f, indent=4)
+        os.replace(tmp_path, TUNING_CACHE_PATH)
+    except OSError:
+        pass
+
+
+# Built-in backends
+register_dct_backend("fftpack", dct_blocks_fftpack, idct_blocks_fftpack)
+register_dct_backend("scipy_fft", dct_blocks_scipy, idct_blocks_scipy)
+register_dct_backend("scipy_fft_workers", partial(dct_blocks_scipy, workers=-1), partial(idct_blocks_scipy, workers=-1))
+register_dct_backend("numpy_matrix", dct_blocks_manual, idct_blocks_manual)
+register_dct_backend("scipy_fft_float32", partial(dct_blocks_scipy, dtype=np.float32),
+                     partial(idct_blocks_scipy, dtype=np.float32), exact=False)
+register_dct_backend("numpy_matrix_float32", partial(dct_blocks_manual, dtype=np.float32),
+                     partial(idct_blocks_manual, dtype=np.float32), exact=False)
@@ -1,6 +1,10 @@
 # Encapsulates different realisations of Discrete cosine transform (DCT)
 
-from .dct_scipy import dct as dct_scipy, idct as idct_scipy
-from .dct_manual import dct as dct_manual, idct as idct_manual
+from .dct_scipy import dct as dct_scipy, idct as idct_scipy, \
+    dct_blocks as dct_blocks_scipy, idct_blocks as idct_blocks_scipy, \
+    dct_blocks_fftpack, idct_blocks_fftpack
+from .dct_manual import dct as dct_manual, idct as idct_manual, \
+    dct_blocks as dct_blocks_manual, idct_blocks as idct_blocks_manual
 
-__all__ = ['dct_scipy', 'idct_scipy', 'dct_manual', 'idct_manual']
+__all__ = ['dct_scipy', 'idct_scipy', 'dct_blocks_scipy', 'idct_blocks_scipy', 'dct_blocks_fftpack',
+           'idct_blocks_fftpack', 'dct_manual', 'idct_manual', 'dct_blocks_manual', 'idct_blocks_manual']
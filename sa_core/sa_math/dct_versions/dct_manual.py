@@ -1,43 +1,57 @@
 import numpy as np
+from functools import lru_cache
 from math import sqrt, cos, pi
 
 
+# 2-D DCT (orthonormal DCT-II) in matrix form: C @ X @ C.T, where C is DCT basis matrix
 def dct(array):
-    N = array.shape[0]
-    dct = np.zeros((N, N))
+    C = get_basis(array.shape[0])
+    return C @ array @ C.T
 
-    for u in range(N):
-        for v in range(N):
-            dct_elem = (su(u) * su(v)) / sqrt(2 * N)
-            sum = 0
-            for x in range(N):
-                for y in range(N):
-                    cos1 = cos((pi * u * (2 * x + 1)) / (2 * N))
-                    cos2 = cos((pi * v * (2 * y + 1)) / (2 * N))
-                    sum += array[x][y] * cos1 * cos2
-            dct_elem *= sum
-            dct[u, v] = dct_elem
 
-    return dct
+# 2-D Inverse DCT in matrix form: C.T @ X @ C (basis matrix is orthonormal, so its inverse is transposed matrix)
+def idct(array):
+    C = get_basis(array.shape[0])
+    return C.T @ array @ C
 
 
-def idct(array):
-    N = array.shape[0]
-    arr = np.zeros((N, N))
-
-    for x in range(N):
-        for y in range(N):
-            arr_elem = 1 / sqrt(2 * N)
-            sum = 0
-            for u in range(N):
-                for v in range(N):
-                    cos1 = cos((pi * u * (2 * x + 1)) / (2 * N))
-                    cos2 = cos((pi * v * (2 * y + 1)) / (2 * N))
-                    sum += su(u) * su(v) * array[u][v] * cos1 * cos2
-            arr_elem *= sum
-            arr[x, y] = arr_elem
-
-    return arr
+# DCT of all blocks of array of blocks (..., N, N) along 'axes': stacked matrix products for all blocks at once.
+# Axes (-2, -1) give 2-D DCT (C @ X @ C.T), axis (-1,) gives DCT of blocks rows (X @ C.T)
+def dct_blocks(blocks, axes=(-2, -1), dtype=np.float64):
+    C = get_basis(blocks.shape[-1]).astype(dtype, copy=False)
+    blocks = blocks.astype(dtype, copy=False)
+
+    if tuple(axes) == (-2, -1):
+        return C @ blocks @ C.T
+    if tuple(axes) == (-1,):
+        return blocks @ C.T
+    raise ValueError("Matrix form of DCT supports axes (-2, -1) and (-1,) only")
+
+
+# Inverse DCT of all blocks of array of blocks (..., N, N) along 'axes' (inverse of 'dct_blocks')
+def idct_blocks(blocks, axes=(-2, -1), dtype=np.float64):
+    C = get_basis(blocks.shape[-1]).astype(dtype, copy=False)
+    blocks = blocks.astype(dtype, copy=False)
+
+    if tuple(axes) == (-2, -1):
+        return C.T @ blocks @ C
+    if tuple(axes) == (-1,):
+        return blocks @ C
+    raise ValueError("Matrix form of DCT supports axes (-2, -1) and (-1,) only")
+
+
+# Returns orthonormal DCT-II basis matrix (N x N): C[u, x] = su(u) * sqrt(2 / N) * cos(pi * u * (2x + 1) / 2N).
+# It is calculated once for each size (matrix is read-only)
+@lru_cache(maxsize=None)
+def get_basis(N):
+    basis = np.zeros((N, N))
+
+    for u in range(N):
+        for x in range(N):
+            basis[u, x] = su(u) * sqrt(2 / N) * cos((pi * u * (2 * x + 1)) / (2 * N))
+
+    basis.flags.writeable = False
+    return basis
 
 
 def su(u):
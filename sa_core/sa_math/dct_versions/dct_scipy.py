@@ -1,9 +1,32 @@
-from scipy.fftpack import dct as pydct, idct as pyidct
+import numpy as np
+import scipy.fft
+import scipy.fftpack
 
 
 def dct(array):
-    return pydct(array, norm='ortho')
+    return scipy.fftpack.dct(array, norm='ortho')
 
 
 def idct(array):
-    return pyidct(array, norm='ortho')
+    return scipy.fftpack.idct(array, norm='ortho')
+
+
+# DCT of all blocks of array of blocks (..., N, N) at once along 'axes' ((-1,) gives the same transform as 'dct').
+# 'workers' is number of threads of scipy.fft, 'dtype' is precision of calculations
+def dct_blocks(blocks, axes=(-1,), workers=None, dtype=np.float64):
+    return scipy.fft.dctn(blocks.astype(dtype, copy=False), axes=axes, norm='ortho', workers=workers)
+
+
+# Inverse DCT of all blocks at once along 'axes' ((-1,) gives the same transform as 'idct')
+def idct_blocks(blocks, axes=(-1,), workers=None, dtype=np.float64):
+    return scipy.fft.idctn(blocks.astype(dtype, copy=False), axes=axes, norm='ortho', workers=workers)
+
+
+# DCT of all blocks at once by legacy scipy.fftpack
+def dct_blocks_fftpack(blocks, axes=(-1,)):
+    return scipy.fftpack.dctn(blocks, axes=axes, norm='ortho')
+
+
+# Inverse DCT of all blocks at once by legacy scipy.fftpack
+def idct_blocks_fftpack(blocks, axes=(-1,)):
+    return scipy.fftpack.idctn(blocks, axes=axes, norm='ortho')
@@ -1,4 +1,6 @@
 # Import Koch-Zhao functions for other sa_core methods (staganalysis KZA method)
 
 from .methods.koch_zhao_method.kz_common import get_blocks as f_get_blocks, \
-     get_block_coeffs as f_get_block_coeffs, get_moduluses_difference as f_get_dif_of_modules
+     get_block_coeffs as f_get_block_coeffs, get_moduluses_difference as f_get_dif_of_modules, \
+     get_image_dct_blocks as f_get_image_dct_blocks, iter_dct_blocks as f_iter_dct_blocks, \
+     get_dct_blocks as f_get_dct_blocks
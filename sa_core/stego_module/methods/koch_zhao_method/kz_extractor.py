@@ -44,23 +44,16 @@ class KochZhaoExtractor:
         return self.__log
 
     def extract(self, img, coords=None):
-        if isinstance(img, str):
-            img = ImageHandler().load(img)
-        elif not isinstance(img, ImageHandler):
-            raise ValueError("'img' must be ImageHandler instance or string img path")
+        img = to_image_handler(img)
 
         # Clear last extraction log
         self.__log = ""
 
-        # Getting image array
-        bimar = img.get_blue()  # Only blue channel of image array
-
         is_random_hiding = self.__seed is not None and self.__seed > 0
         bits_array = []  # List for extracted data
 
-        # Split all pixels into blocks and get frequency representation
-        blocks = get_blocks(bimar)
-        dct_blocks = get_dct_blocks(blocks)
+        # Split all pixels of blue channel into blocks and get frequency representation
+        dct_blocks = get_image_dct_blocks(img, self.__block_size)
 
         # Main extraction operations
         if is_random_hiding:
@@ -1,3 +1,5 @@
+import os
+
 from sa_core.image_handler import *
 from sa_core.sa_lib import get_random_start, str_to_bits_array
 
@@ -18,6 +20,7 @@ class KochZhaoHider:
         self.__coeffs = coeffs
         self.__block_size = block_size
         self.__seed = seed
+        self.__stego_img = None
 
     # Set hider parameters
     def set_params(self, threshold=None, coeffs=None, block_size=None, seed=None):
@@ -37,15 +40,19 @@ class KochZhaoHider:
         self.__block_size = self.__default_block_size
         self.__seed = self.__default_seed
 
-    def hide(self, img, data: str):
-        if isinstance(img, str):
-            img = ImageHandler().load(img)
-        elif not isinstance(img, ImageHandler):
-            raise ValueError("'img' must be ImageHandler instance or string img path")
+    # Returns image handler with image array of last hiding (its array or encoded bytes can be got without disk usage)
+    def get_image(self):
+        return self.__stego_img
+
+    # Hides data into image. If 'save' is True image with hidden data is saved to file near the source image file
+    def hide(self, img, data: str, save=True):
+        img = to_image_handler(img)
+        if save and img.get_path() is None:
+            raise ValueError("Image without path can't be saved to file: use save=False and get_image()")
 
         # Getting image array
         image_path = img.get_path()
-        imar = img.get_array()  # Image (pixels) array
+        imar = img.get_array(read_only=True).copy()  # Image (pixels) array (copy: source array stays unchanged)
         bimar = img.get_blue()  # Only blue channel of image array
 
         is_random_hiding = self.__seed is not None and self.__seed > 0  # Define variation of hiding method
@@ -95,14 +102,14 @@ class KochZhaoHider:
         blocks = normalize_all_blocks(blocks, self.__block_size)
         imar = blocks_to_imar(imar, blocks, self.__block_size)
 
-        # Definition name of result file (image file with hidden data)
-        point_index = image_path.rfind('.')
-        file_postfix = FILES_POSTFIX[1] if is_random_hiding else FILES_POSTFIX[0]
-        new_path = image_path[:point_index] + file_postfix + image_path[point_index:]
-
-        # Saving new image file
-        img.set_array(imar)
-        img.save(new_path)
+        # Saving image array with hidden data in new handler (source image handler stays unchanged)
+        # and new image file if it is needed
+        new_path = self.__get_stego_path(image_path, is_random_hiding) if save else None
+        stego_img = ImageHandler(dtype=img.get_dtype())
+        stego_img.set_array(imar, path=new_path)
+        if save:
+            stego_img.save(new_path)
+        self.__stego_img = stego_img
 
         # Return meta-data of hiding
         return capacity, sdata_size, start_block
@@ -126,6 +133,20 @@ class KochZhaoHider:
         # Return modified block
         return block
 
+    # Returns available capacity of container (image) in bits - number of blocks: only image header is needed for it
+    def get_capacity(self, img):
+        img = to_image_handler(img)
+
+        width, height = img.get_size()
+        return (height // self.__block_size) * (width // self.__block_size)
+
+    # Definition name of result file (image file with hidden data)
+    def __get_stego_path(self, image_path, is_random_hiding):
+        image_path = os.fspath(image_path)
+        point_index = image_path.rfind('.')
+        file_postfix = FILES_POSTFIX[1] if is_random_hiding else FILES_POSTFIX[0]
+        return image_path[:point_index] + file_postfix + image_path[point_index:]
+
     # Returns available data size for hiding (by container capacity and size of data for hiding)
     def __define_available_hiding_size(self, container_size, secret_size):
         if container_size > secret_size:
@@ -1,6 +1,8 @@
 import random
 import numpy as np
 
+from sa_core.image_handler import ImgChannel
+
 from .lsb_config import *
 
 
@@ -39,8 +41,14 @@ def imar_to_linear(imar):
     return linear_imar
 
 
+# Returns least significant bits of image pixels values as linear array (in the same order as 'imar_to_linear')
+def get_linear_lsb(img):
+    bit_planes = [img.get_bit_plane(channel) for channel in ImgChannel]
+    return np.stack(bit_planes, axis=2).ravel()
+
+
 # Converts linear array to 3-dimensional image array
-def linear_imar_to_imar(linear_imar, sizes, dtype=np.int32):
+def linear_imar_to_imar(linear_imar, sizes, dtype=np.uint8):
     height, width, deep = sizes
     imar = np.zeros(sizes, dtype)
 
@@ -38,16 +38,13 @@ class LsbExtractor:
         return self.__log
 
     def extract(self, img):
-        if isinstance(img, str):
-            img = ImageHandler().load(img)
-        elif not isinstance(img, ImageHandler):
-            raise ValueError("'img' must be ImageHandler instance or string img path")
+        img = to_image_handler(img)
 
         # Clear last extraction log
         self.__log = ""
 
         # Getting image array and sizes
-        imar = img.get_array()
+        imar = img.get_array(read_only=True)
         height, width, deep = imar.shape
 
         is_random_hiding = self.__seed is not None and self.__seed > 0
@@ -81,25 +78,18 @@ class LsbExtractor:
     # Extracting linear LSB hidden data
     def __extract_lsb_linear(self, img: ImageHandler, length):
         # Getting image array and sizes
-        imar = img.get_array()
+        imar = img.get_array(read_only=True)
         height, width, deep = imar.shape
 
-        bits_array = []  # List for extracted data
-        linear_imar = imar_to_linear(imar)  # Converts image array to linear array
+        linear_lsb = get_linear_lsb(img)  # Least significant bits of image array as linear array
 
         # Calc offset for linear array pointer based on known start pixel index
         offset = deep * self.__start_ind
+        if length + offset > len(linear_lsb):
+            raise IndexError("Length of data is larger than image capacity")
 
         # Extraction
-        for i in range(offset, length + offset):
-            img_byte = linear_imar[i]
-            img_byte_str = bin(img_byte)
-
-            bit = int(img_byte_str[-1])
-            bits_array.append(bit)
-
-            if len(bits_array) >= length:
-                break
+        bits_array = linear_lsb[offset:length + offset].tolist()
 
         # Converting bits array to string
         res = bits_array_to_str(bits_array)
@@ -107,22 +97,16 @@ class LsbExtractor:
 
     # Extracting pseudo-random LSB hidden data
     def __extract_lsb_random(self, img: ImageHandler, length):
-        imar = img.get_array()
+        imar = img.get_array(read_only=True)
         height, width, deep = imar.shape
 
-        bits_array = []  # List for extracted data
-        linear_imar = imar_to_linear(imar)  # Converts image array to linear array
+        linear_lsb = get_linear_lsb(img)  # Least significant bits of image array as linear array
 
         # Calc pseudo-random indexes based on known seed
-        indexes = generate_indexes_for_linear_array(len(linear_imar), self.__seed, length)
+        indexes = generate_indexes_for_linear_array(len(linear_lsb), self.__seed, length)
 
         # Extraction
-        for ind in indexes:
-            img_byte = linear_imar[ind]
-            img_byte_str = bin(img_byte)
-
-            bit = int(img_byte_str[-1])
-            bits_array.append(bit)
+        bits_array = linear_lsb[indexes].tolist()
 
         # Converting bits array to string
         res = bits_array_to_str(bits_array)
@@ -1,3 +1,5 @@
+import os
+
 from sa_core.image_handler import *
 from sa_core.sa_lib import str_to_bits_array
 
@@ -11,6 +13,7 @@ class LsbHider:
 
     def __init__(self, seed=__default_seed):
         self.__seed = seed
+        self.__stego_img = None
 
     # Set hider parameters
     def set_params(self, seed=None):
@@ -21,11 +24,15 @@ class LsbHider:
     def reset_params(self):
         self.__seed = self.__default_seed
 
-    def hide(self, img, data: str):
-        if isinstance(img, str):
-            img = ImageHandler().load(img)
-        elif not isinstance(img, ImageHandler):
-            raise ValueError("'img' must be ImageHandler instance or string img path")
+    # Returns image handler with image array of last hiding (its array or encoded bytes can be got without disk usage)
+    def get_image(self):
+        return self.__stego_img
+
+    # Hides data into image. If 'save' is True image with hidden data is saved to file near the source image file
+    def hide(self, img, data: str, save=True):
+        img = to_image_handler(img)
+        if save and img.get_path() is None:
+            raise ValueError("Image without path can't be saved to file: use save=False and get_image()")
 
         image_path = img.get_path()
         is_random_hiding = self.__seed is not None and self.__seed > 0
@@ -34,7 +41,7 @@ class LsbHider:
         bits_array = str_to_bits_array(data)
 
         # Compare of image capacity and secret data size (all in bits)
-        capacity = self.__calc_capacity(img.get_array())
+        capacity = self.get_capacity(img)
         sdata_size = len(bits_array)
         to_hide_size, relative_volume = self.__define_available_hiding_size(capacity, sdata_size)
 
@@ -44,14 +51,14 @@ class LsbHider:
         else:
             imar = self.__lsb_linear(img, bits_array)
 
-        # Definition name of result file (image file with hidden data)
-        point_index = image_path.rfind('.')
-        file_postfix = FILES_POSTFIX[1] if is_random_hiding else FILES_POSTFIX[0]
-        new_path = image_path[:point_index] + file_postfix + image_path[point_index:]
-
-        # Saving new image file
-        img.set_array(imar)
-        img.save(new_path)
+        # Saving image array with hidden data in new handler (source image handler stays unchanged)
+        # and new image file if it is needed
+        new_path = self.__get_stego_path(image_path, is_random_hiding) if save else None
+        stego_img = ImageHandler(dtype=img.get_dtype())
+        stego_img.set_array(imar, path=new_path)
+        if save:
+            stego_img.save(new_path)
+        self.__stego_img = stego_img
 
         # Return meta-data of hiding
         return capacity, sdata_size, relative_volume
@@ -59,7 +66,7 @@ class LsbHider:
     # Hides data into image array linearly
     def __lsb_linear(self, img: ImageHandler, bits_array):
         # Getting array and sizes
-        imar = img.get_array()
+        imar = img.get_array(read_only=True)
         height, width, deep = imar.shape
 
         # Converting image array to linear array
@@ -75,7 +82,7 @@ class LsbHider:
                 break
 
         # Converting linear array to image array
-        imar = linear_imar_to_imar(linear_imar, (height, width, deep))
+        imar = linear_imar_to_imar(linear_imar, (height, width, deep), imar.dtype)
 
         # Return image array contains hidden data
         return imar
@@ -83,7 +90,7 @@ class LsbHider:
     # Hides data into image array pseudo-randomly
     def __lsb_random(self, img: ImageHandler, bits_array, sdata_size):
         # Getting array and sizes
-        imar = img.get_array()
+        imar = img.get_array(read_only=True)
         height, width, deep = imar.shape
 
         # Converting image array to linear array
@@ -99,18 +106,28 @@ class LsbHider:
             k += 1
 
         # Converting linear array to image array
-        imar = linear_imar_to_imar(linear_imar, (height, width, deep))
+        imar = linear_imar_to_imar(linear_imar, (height, width, deep), imar.dtype)
 
         # Return image array contains hidden data
         return imar
 
-    # Returns available capacity of container (image array) in bits
-    def __calc_capacity(self, img_array):
-        pixels = img_array.shape[0] * img_array.shape[1]
+    # Returns available capacity of container (image) in bits: only image header is needed for it
+    def get_capacity(self, img):
+        img = to_image_handler(img)
+
+        width, height = img.get_size()
+        pixels = width * height
         bits_num = pixels * 3
 
         return bits_num
 
+    # Definition name of result file (image file with hidden data)
+    def __get_stego_path(self, image_path, is_random_hiding):
+        image_path = os.fspath(image_path)
+        point_index = image_path.rfind('.')
+        file_postfix = FILES_POSTFIX[1] if is_random_hiding else FILES_POSTFIX[0]
+        return image_path[:point_index] + file_postfix + image_path[point_index:]
+
     # Returns available data size for hiding (by container capacity and size of data for hiding)
     # and relative volume of secret data
     def __define_available_hiding_size(self, container_size, secret_size):
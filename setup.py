@@ -8,7 +8,7 @@ setup(
     description="Steganalysis core",
     long_description=open(join(dirname(__file__), 'README.txt')).read(),
     author="Yaroslav Grachev",
-    python_requires='>=3.3, !=2.*',
+    python_requires='>=3.8',
     install_requires=[
         'numpy',
         'scipy',